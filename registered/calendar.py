@@ -2,23 +2,21 @@
 CLI tool to output the calendar for each garage
 """
 
+import csv
 import sys
-import argparse
-from registered.rating import Rating
-from registered.parser import CalendarDate
 
 
 def calendar(rating):
     """
     Generate the calendar for a given rating.
     """
-    cal = rating["cal"]
+    # pylint: disable=import-outside-toplevel
+    from registered.parser import CalendarDate
+
     garages = set()
     dates = set()
     services = {}
-    for record in cal:
-        if not isinstance(record, CalendarDate):
-            continue
+    for record in rating.records("cal", CalendarDate):
         garages.add(record.garage)
         dates.add(record.date)
         key = (record.date, record.garage)
@@ -28,10 +26,12 @@ def calendar(rating):
 
     yield ["date", *garages]
 
+    get_service = services.get
     for date in sorted(dates):
-        date_str = date.strftime("%Y-%m-%d")
-        garage_values = (services.get((date, garage), "") for garage in garages)
-        yield [date_str, *garage_values]
+        yield [
+            date.strftime("%Y-%m-%d"),
+            *[get_service((date, garage), "") for garage in garages],
+        ]
 
 
 def main_combine(path, file=sys.stdout):
@@ -40,8 +40,13 @@ def main_combine(path, file=sys.stdout):
 
     Optionally takes a file to write to (default: stdout)
     """
-    for row in calendar(Rating(path)):
-        print(",".join(row), file=file)
+    # deferred so that `--help` doesn't need to load the parser
+    # pylint: disable=import-outside-toplevel
+    from registered.rating import Rating
+
+    # the "\n" is translated by the file, which may use "\r\n"
+    writer = csv.writer(file, lineterminator="\n")
+    writer.writerows(calendar(Rating(path)))
 
 
 def main(args):
@@ -52,10 +57,11 @@ def main(args):
     main_combine(path)
 
 
-parser = argparse.ArgumentParser(
-    description="Print the calendar from the HASTUS export files (post-merge)"
-)
-parser.add_argument("DIR", help="The Combine directory where all the files live")
-
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Print the calendar from the HASTUS export files (post-merge)"
+    )
+    parser.add_argument("DIR", help="The Combine directory where all the files live")
     main(parser.parse_args())
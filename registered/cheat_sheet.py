@@ -36,71 +36,62 @@ Mon 2/15 hl6
 """
 
 import sys
-import argparse
-from collections import defaultdict
-from datetime import timedelta
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, timedelta
 import itertools
 import operator
-import attr
-from registered.rating import Rating
-from registered.parser import CalendarDate
-from registered import seasons
 
-(DATE_RANGE_FORMAT, DATE_FORMAT) = {
-    "darwin": ("%a %-m/%-d/%Y", "%a %-m/%-d"),
-    "linux": ("%a %-m/%-d/%Y", "%a %-m/%-d"),
-    "win32": ("%a %#m/%#d/%Y", "%a %#m/%#d"),
-}[sys.platform]
+# Windows uses # instead of - to remove the leading zero
+if sys.platform == "win32":
+    (DATE_RANGE_FORMAT, DATE_FORMAT) = ("%a %#m/%#d/%Y", "%a %#m/%#d")
+else:
+    (DATE_RANGE_FORMAT, DATE_FORMAT) = ("%a %-m/%-d/%Y", "%a %-m/%-d")
 
 
-@attr.s
+@dataclass(slots=True, frozen=True)
 class CheatSheet:
     """
     CheatSheet represents a summary of a rating.
     """
 
-    season_name = attr.ib()
-    start_date = attr.ib()
-    end_date = attr.ib()
-    weekday_base = attr.ib()
-    saturday_base = attr.ib()
-    sunday_base = attr.ib()
-    date_combos = attr.ib(converter=dict)
+    season_name: str
+    start_date: date
+    end_date: date
+    weekday_base: "ExceptionCombination"
+    saturday_base: "ExceptionCombination"
+    sunday_base: "ExceptionCombination"
+    date_combos: dict[date, "ExceptionCombination"]
+
+    def __post_init__(self):
+        object.__setattr__(self, "date_combos", dict(self.date_combos))
 
     def __str__(self):
         # get the first weekday to apply the DR1/ST1 combos
         first_weekday = self.start_date
         while first_weekday < self.end_date:
-            if first_weekday.weekday() < 5:  # weekday
-                if first_weekday not in self.date_combos:  # not already overridden
-                    break
-            first_weekday += timedelta(days=1)
+            weekday = first_weekday.weekday()
+            if weekday >= 5:  # weekend: jump to Monday
+                first_weekday = min(
+                    first_weekday + timedelta(days=7 - weekday), self.end_date
+                )
+            elif first_weekday in self.date_combos:  # already overridden
+                first_weekday += timedelta(days=1)
+            else:
+                break
 
         date_combos = list(self.date_combos.items())
         date_combos.append(
             (first_weekday, f"{str(self.weekday_base)} DR1 ST1 *** TAKE THIS OUT")
         )
-        date_combos.sort()
-        exceptions = []
-        for combo, date_group in itertools.groupby(
-            date_combos, key=operator.itemgetter(1)
-        ):
-            dates = {date for (date, _) in date_group}
-            for group in date_groups(dates):
-                min_date = min(group)
-                if len(group) == 1:
-                    exceptions.append(f"{min_date.strftime(DATE_FORMAT)} {str(combo)}")
-                else:
-                    max_date = max(group)
-                    exceptions.append(
-                        min_date.strftime(DATE_FORMAT)
-                        + " - "
-                        + max_date.strftime(DATE_FORMAT)
-                        + " "
-                        + str(combo)
-                    )
-
-        exceptions = "\n".join(exceptions)
+        date_combos.sort(key=operator.itemgetter(0))
+        exceptions = "\n".join(
+            f"{date_range_str(group)} {combo}"
+            for (combo, date_group) in itertools.groupby(
+                date_combos, key=operator.itemgetter(1)
+            )
+            for group in date_groups(date for (date, _) in date_group)
+        )
 
         return f"""\
 {self.season_name} {self.end_date.year}
@@ -119,28 +110,33 @@ Sunday {str(self.sunday_base)}
         """
         Create a CheatSheet given an iterable of CalendarDate records.
         """
-        date_to_garage_services = defaultdict(dict)
-        day_types = {}
+        # pylint: disable=import-outside-toplevel
+        from registered import seasons
+
+        # date => [day type, {garage => service}]
+        date_to_garage_services = {}
         for record in records:
-            if not isinstance(record, CalendarDate):
-                continue
             if record.service_key == "":
                 continue
-            date_to_garage_services[record.date][record.garage] = record.service_key
-            day_types[record.date] = record.day_type
+            entry = date_to_garage_services.get(record.date)
+            if entry is None:
+                entry = date_to_garage_services[record.date] = [None, {}]
+            entry[0] = record.day_type
+            entry[1][record.garage] = record.service_key
 
         date_to_combos = {
-            date: ExceptionCombination.from_garages(garages)
-            for (date, garages) in date_to_garage_services.items()
+            date: (day_type, ExceptionCombination.from_garages(garages))
+            for (date, (day_type, garages)) in date_to_garage_services.items()
         }
-        weekday_base = cls.calculate_bases(date_to_combos, day_types, "Weekday")
-        saturday_base = cls.calculate_bases(date_to_combos, day_types, "Saturday")
-        sunday_base = cls.calculate_bases(date_to_combos, day_types, "Sunday")
+        (weekday_base, saturday_base, sunday_base) = cls.calculate_bases(
+            date_to_combos.values()
+        )
 
+        bases = {weekday_base, saturday_base, sunday_base}
         date_combos = {
             date: combo
-            for (date, combo) in date_to_combos.items()
-            if combo not in [weekday_base, saturday_base, sunday_base]
+            for (date, (_, combo)) in date_to_combos.items()
+            if combo not in bases
         }
 
         start_date = min(date_to_garage_services.keys())
@@ -157,32 +153,73 @@ Sunday {str(self.sunday_base)}
         )
 
     @staticmethod
-    def calculate_bases(date_to_combos, day_types, day_type):
+    def calculate_bases(day_type_combos):
         """
-        Find the most commonly used combo for a given day type (Weekday, Saturday, Sunday).
+        Find the most commonly used combo for each day type, given (day type, combo) pairs.
+
+        Returns a (Weekday, Saturday, Sunday) tuple of combos.
+
+        Ties go to the combo which appears first, on any day type. If there's
+        nothing to choose from, that's the first combo.
         """
-        dates = {date for date in day_types if day_types[date] == day_type}
-        base = max(
-            date_to_combos.values(),
-            key=lambda combo: sum(
-                1
-                for date in date_to_combos
-                if date in dates
-                and date_to_combos[date] == combo
-                and not combo.should_take_out()
+        counts = {day_type: Counter() for day_type in ["Weekday", "Saturday", "Sunday"]}
+        # combo => None, in order of first appearance
+        combos = {}
+        for day_type, combo in day_type_combos:
+            combos.setdefault(combo)
+            day_type_counts = counts.get(day_type)
+            if day_type_counts is not None and not combo.should_take_out():
+                day_type_counts[combo] += 1
+
+        # max() returns the first of any tied combos
+        return tuple(
+            max(combos, key=day_type_counts.__getitem__, default=None)
+            for day_type_counts in counts.values()
+        )
+
+
+def frozen_exceptions(garage_exceptions):
+    """
+    Converter from a {Service => {Garage}} mapping to a sorted tuple of
+    (service, frozenset(garages)) pairs, so that it can be hashed.
+    """
+    return tuple(
+        sorted(
+            (
+                (service, frozenset(garages))
+                for (service, garages) in dict(garage_exceptions).items()
             ),
+            key=operator.itemgetter(0),
         )
-        return base
+    )
 
 
-@attr.s
+@dataclass(slots=True, frozen=True)
 class ExceptionCombination:
     """
     A group of services that are activated together.
+
+    Combinations are hashable, so they can be counted and used as dictionary keys.
     """
 
-    service = attr.ib()
-    garage_exceptions = attr.ib(converter=dict, default={})
+    service: str
+    garage_exceptions: tuple[tuple[str, frozenset[str]], ...] = ()
+    # calculated once, since combinations are frozen
+    _service_keys: frozenset[str] = field(init=False, compare=False, repr=False)
+    _take_out: bool = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self):
+        garage_exceptions = frozen_exceptions(self.garage_exceptions)
+        services = {service for (service, _) in garage_exceptions}
+        service_keys = frozenset(services | {self.service})
+        take_out = any(
+            True
+            for service in service_keys
+            if service[1:2] in {"3", "4"} or service[:2].lower() in {"we", "wt", "wn"}
+        )
+        object.__setattr__(self, "garage_exceptions", garage_exceptions)
+        object.__setattr__(self, "_service_keys", service_keys)
+        object.__setattr__(self, "_take_out", take_out)
 
     @classmethod
     def from_garages(cls, garages):
@@ -222,7 +259,7 @@ class ExceptionCombination:
 
         exceptions = ", ".join(
             f'{service} ({", ".join(sorted(garages))})'
-            for (service, garages) in sorted(self.garage_exceptions.items())
+            for (service, garages) in self.garage_exceptions
         )
 
         return f"{self.service}, {exceptions}{suffix}"
@@ -231,7 +268,7 @@ class ExceptionCombination:
         """
         Return a set of all service keys used by this combo.
         """
-        return set(self.garage_exceptions.keys()) | {self.service}
+        return self._service_keys
 
     def should_take_out(self):
         """
@@ -240,47 +277,45 @@ class ExceptionCombination:
         - Level 3 or 4 service
         - Weather-related services
         """
-        return any(
-            True
-            for service in self.service_keys()
-            if service.lower()[1] in {"3", "4"}
-            or service.lower()[:2] in {"we", "wt", "wn"}
-        )
+        return self._take_out
 
 
 def date_groups(dates):
     """
-    Given an iterable of dates, group them into adjacent sets.
+    Given an iterable of dates, group them into sorted lists of adjacent dates.
     """
-    groups = []
-    current_group = None
-    last_date = None
-    for date in sorted(dates):
-        if last_date is None:
-            current_group = {date}
-            last_date = date
-            continue
-
-        if date - last_date == timedelta(days=1):
-            # adjacent to last date
-            last_date = date
-            current_group.add(date)
-            continue
-
-        # not adjacent, start a new group
-        groups.append(current_group)
-        current_group = {date}
-        last_date = date
-
-    groups.append(current_group)
-    return groups
+    dates = sorted(dates)
+    ordinals = [date.toordinal() for date in dates]
+    # a new group starts wherever the next date isn't the following day
+    breaks = [
+        index
+        for index in range(1, len(ordinals))
+        if ordinals[index] - ordinals[index - 1] != 1
+    ]
+    starts = [0, *breaks]
+    ends = [*breaks, len(dates)]
+    return [dates[start:end] for (start, end) in zip(starts, ends) if start < end]
+
+
+def date_range_str(dates):
+    """
+    Format a sorted list of adjacent dates as either a single date or a "first - last" range.
+    """
+    first = dates[0].strftime(DATE_FORMAT)
+    if len(dates) == 1:
+        return first
+
+    return f"{first} - {dates[-1].strftime(DATE_FORMAT)}"
 
 
 def cheat_sheet(rating):
     """
     Generate the sheet for a given rating.
     """
-    return CheatSheet.from_records(rating["cal"])
+    # pylint: disable=import-outside-toplevel
+    from registered.parser import CalendarDate
+
+    return CheatSheet.from_records(rating.records("cal", CalendarDate))
 
 
 def main_combine(path, file=sys.stdout):
@@ -289,6 +324,10 @@ def main_combine(path, file=sys.stdout):
 
     Optionally takes a file to write to (default: stdout)
     """
+    # deferred so that `--help` doesn't need to load the parser
+    # pylint: disable=import-outside-toplevel
+    from registered.rating import Rating
+
     print(cheat_sheet(Rating(path)), file=file)
 
 
@@ -300,10 +339,13 @@ def main(args):
     main_combine(path)
 
 
-parser = argparse.ArgumentParser(
-    description="Generate the rating cheat sheet from the HASTUS export files"
-)
-parser.add_argument("DIR", help="The HASTUS_export directory where all the files live")
-
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate the rating cheat sheet from the HASTUS export files"
+    )
+    parser.add_argument(
+        "DIR", help="The HASTUS_export directory where all the files live"
+    )
     main(parser.parse_args())
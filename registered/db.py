@@ -2,14 +2,17 @@
 Functions for accessing data from the TransitMaster database.
 """
 
+import functools
 import itertools
 import os
 import pyodbc
 from registered import environ
 
 CONN = None
+GEO_NODE_CHUNK_SIZE = 500
 
 
+@functools.cache
 def sql_driver():
     """
     Returns the appropriate SQL Server driver for the current OS.
@@ -49,26 +52,27 @@ def conn():
 
 def grouper(iterable, chunk_size):
     """
-    Group an iterable into lists of length chunk_size.
-
-    From: https://stackoverflow.com/a/29524877
+    Group an iterable into tuples of length chunk_size (the last may be shorter).
     """
-    iterable = iter(iterable)
-    while True:
-        chunk = list(itertools.islice(iterable, chunk_size))
-        if not chunk:
-            break
-        yield chunk
+    return itertools.batched(iterable, chunk_size)
 
 
-def maybe_float(string_or_none):
-    """
-    Parse a string into a float, or None.
+@functools.cache
+def geo_node_sql(count):
     """
-    if string_or_none in {None, ""}:
-        return None
+    Return the GEO_NODE query for the given number of stop IDs.
 
-    return float(string_or_none)
+    Cached, so that the same statement text is re-used for each full chunk.
+    """
+    question_marks = ", ".join("?" * count)
+    # cast on the server, so that we get floats (or None) back directly
+    return (
+        "SELECT GEO_NODE_ABBR,GEO_NODE_NAME,"
+        "CAST(MDT_LATITUDE AS FLOAT)/10000000,"
+        "CAST(MDT_LONGITUDE AS FLOAT)/10000000 "
+        "FROM GEO_NODE "
+        f"WHERE GEO_NODE_ABBR IN ({question_marks});"
+    )
 
 
 def geo_node(abbrs):  # pylint: disable=inconsistent-return-statements
@@ -80,15 +84,10 @@ def geo_node(abbrs):  # pylint: disable=inconsistent-return-statements
     except pyodbc.OperationalError:
         return []
 
-    for chunk in grouper(abbrs, 50):
-        question_marks = ", ".join("?" for _ in chunk)
-        result = cursor.execute(
-            "SELECT GEO_NODE_ABBR,GEO_NODE_NAME,"
-            "MDT_LATITUDE/10000000,"
-            "MDT_LONGITUDE/10000000 "
-            "FROM GEO_NODE "
-            f"WHERE GEO_NODE_ABBR IN ({question_marks});",
-            chunk,
-        )
-        for stop_id, stop_name, lat, lon in result:
-            yield (stop_id, stop_name, maybe_float(lat), maybe_float(lon))
+    # each chunk returns at most one row per stop ID: fetch them all at once
+    cursor.arraysize = GEO_NODE_CHUNK_SIZE
+    # SQL Server allows up to 2100 parameters per query
+    for chunk in grouper(abbrs, GEO_NODE_CHUNK_SIZE):
+        cursor.execute(geo_node_sql(len(chunk)), chunk)
+        while rows := cursor.fetchmany():
+            yield from map(tuple, rows)
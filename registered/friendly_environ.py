@@ -2,36 +2,97 @@
 Helpers for friendly environment access.
 """
 
+from collections import ChainMap
+from collections.abc import Mapping
+import os
+
+
+def parse_env_file(path):
+    """
+    Parse the KEY=value lines of an env file into a dictionary.
+
+    Returns an empty dictionary if the file doesn't exist.
+    """
+    # the file is small: read it in one call rather than through a text wrapper
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return {}
+    try:
+        data = os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+
+    values = {}
+    for line in data.decode("utf-8").splitlines():
+        (key, separator, value) = line.partition("=")
+        if separator:
+            values[key.strip()] = value.strip()
+    return values
+
+
+class EnvFile(Mapping):
+    """
+    Read-only mapping of the values in an env file.
+
+    The file is only parsed the first time a value is looked up.
+    """
+
+    def __init__(self, path):
+        self._path = path
+        self._values = None
+
+    def _load(self):
+        if self._values is None:
+            self._values = parse_env_file(self._path)
+        return self._values
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __contains__(self, key):
+        return key in self._load()
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
 
 class FriendlyEnviron:
     """
     Wrapper around os.environ which raises a more helpful error on missing keys.
+
+    Earlier parents take precedence over later ones.
     """
 
+    __slots__ = ("_environ",)
+
     def __init__(self, *parents):
-        self._parents = parents
+        self._environ = ChainMap(*parents)
 
     def __getitem__(self, key):
         """
         Item access for environment variables.
         """
         self._validate_key_type(key)
-        for parent in self._parents:
-            if key in parent:
-                return parent[key]
-        raise KeyError(
-            f"{repr(key)}: In order to add this to your environment, add it to the .env file."
-        ) from None
+        try:
+            return self._environ[key]
+        except KeyError:
+            raise KeyError(
+                f"{repr(key)}: In order to add this to your environment, add it to the .env file."
+            ) from None
 
     def get(self, key, missing_val=None):
         """
         Optional access for environment variables.
         """
         self._validate_key_type(key)
-        for parent in self._parents:
-            if key in parent:
-                return parent[key]
-        return missing_val
+        try:
+            return self._environ[key]
+        except KeyError:
+            return missing_val
 
     @staticmethod
     def _validate_key_type(key):
@@ -6,8 +6,11 @@ The HASTUS data is exported \\\\<HASTUS_FILE_SERVER>\\KKO. We want those files t
 is in support\\rating_template.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import itertools
 import argparse
+import logging
 import os
 from pathlib import Path
 import shutil
@@ -21,6 +24,9 @@ HASTUS = environ["HASTUS_FILE_SERVER"]
 TRANSITMASTER = environ["TRANSITMASTER_FILE_SERVER"]
 TRANSITMASTER_DB = environ["TRANSITMASTER_DATABASE_SERVER"]
 SLASH = "\\"
+FIRST_RECORD_READ_SIZE = 8192
+
+logger = logging.getLogger(__name__)
 
 
 def smb_path(server, *args):
@@ -33,6 +39,25 @@ def smb_path(server, *args):
     return f"{SLASH}{SLASH}{server}{SLASH}{SLASH.join(args)}"
 
 
+@functools.cache
+def smb_listdir(path):
+    """
+    List the entries in an SMB directory.
+
+    Each listing is a full round-trip to the server, so the result is cached
+    for the rest of the run.
+    """
+    return tuple(smbclient.listdir(path))
+
+
+@functools.cache
+def hastus_export_path(hastus_export):
+    """
+    Return the SMB path of a HASTUS export folder.
+    """
+    return smb_path(HASTUS, "KKO", hastus_export)
+
+
 def configure_smb(args):
     """
     Configure the SMB client, prompting for username/password if needed.
@@ -63,21 +88,25 @@ def list_hastus_export_dir(args):
     if args.hastus_export_folder:
         return os.listdir(args.hastus_export_folder)
 
-    return smbclient.listdir(smb_path(HASTUS, "KKO", args.hastus_export))
+    return smb_listdir(hastus_export_path(args.hastus_export))
 
 
-def open_hastus_file(args, filename):
+def open_hastus_file(args, filename, buffering=-1):
     """
     Open a file from a HASTUS export folder.
 
     Will use the local HASTUS export folder if present, otherwise will look up
-    via SMB.
+    via SMB. `buffering` is passed along to `open`: over SMB, it's the size of
+    each read from the server.
     """
     if args.hastus_export_folder:
         file_path = Path(args.hastus_export_folder) / filename
-        return file_path.open()
+        return file_path.open(buffering=buffering)
 
-    return smbclient.open_file(smb_path(HASTUS, "KKO", args.hastus_export, filename))
+    return smbclient.open_file(
+        f"{hastus_export_path(args.hastus_export)}{SLASH}{filename}",
+        buffering=buffering,
+    )
 
 
 def copy_hastus_file(args, filename, destination):
@@ -91,21 +120,22 @@ def copy_hastus_file(args, filename, destination):
         return shutil.copy(Path(args.hastus_export_folder) / filename, destination)
 
     return smbclient.shutil.copy(
-        smb_path(HASTUS, "KKO", args.hastus_export, filename),
+        f"{hastus_export_path(args.hastus_export)}{SLASH}{filename}",
         destination,
     )
 
 
+@functools.cache
 def available_hastus_exports():
     """
     Return the available HASTUS exports, sorted most-recent first.
+
+    The result is cached for the rest of the run.
     """
     exports = [
-        export
-        for export in smbclient.listdir(smb_path(HASTUS, "KKO"))
-        if "AVL" in export
+        export for export in smb_listdir(smb_path(HASTUS, "KKO")) if "AVL" in export
     ]
-    return sorted(exports, key=seasons.sort_key_hastus_export, reverse=True)
+    return tuple(sorted(exports, key=seasons.sort_key_hastus_export, reverse=True))
 
 
 def prompt_hastus_export():
@@ -116,7 +146,7 @@ def prompt_hastus_export():
         {
             "type": "list",
             "name": "hastus_export",
-            "choices": available_hastus_exports()[:10],
+            "choices": list(available_hastus_exports()[:10]),
             "default": 0,
             "message": "Choose a HASTUS export to use:",
         }
@@ -134,7 +164,11 @@ def calculate_rating_folder(args):
     (calendar_file,) = itertools.islice(
         (f for f in files if f.lower().endswith(".cal")), 0, 1
     )
-    with open_hastus_file(args, calendar_file) as cal_file:
+    # only the first record is needed, so read a small block rather than a
+    # full-size (64 KiB) SMB read
+    with open_hastus_file(
+        args, calendar_file, buffering=FIRST_RECORD_READ_SIZE
+    ) as cal_file:
         (cal_record,) = itertools.islice(parser.parse_lines(cal_file), 0, 1)
     season = seasons.season_for_date(cal_record.start_date)
     rating_folder = cal_record.start_date.strftime(f"{season}%m%d%Y")
@@ -150,30 +184,57 @@ def calculate_rating_folder(args):
     return prompt(questions).get("folder")
 
 
+def copy_if_changed(src, dst):
+    """
+    Copy a file with `shutil.copy2`, unless `dst` is already a copy of `src`.
+
+    `copy2` keeps the modification time, so a destination with the same size
+    and modification time hasn't changed since it was copied.
+    """
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+    except FileNotFoundError:
+        pass
+    else:
+        if (src_stat.st_size, src_stat.st_mtime_ns) == (
+            dst_stat.st_size,
+            dst_stat.st_mtime_ns,
+        ):
+            return dst
+
+    return shutil.copy2(src, dst)
+
+
 def pull_hastus_directory(args, tempdir):
     """
     Pull the HASTUS rating to the local support/ratings folder.
     """
     rating_template = Path(__file__).parent.parent / "support" / "rating_template"
-    shutil.copytree(rating_template, tempdir, dirs_exist_ok=True)
+    shutil.copytree(
+        rating_template, tempdir, copy_function=copy_if_changed, dirs_exist_ok=True
+    )
     hastus_files = merge.dedup_prefix(list_hastus_export_dir(args))
-    changed = False
-    for hastus_file in hastus_files:
-        dst = tempdir / "Combine" / "HASTUS_export" / hastus_file
-        if dst.exists():
-            continue
-        print(f"Pulling {hastus_file}...")
-        copy_hastus_file(
-            args,
-            hastus_file,
-            tempdir / "Combine" / "HASTUS_export" / hastus_file,
-        )
-        changed = True
+    export_dir = tempdir / "Combine" / "HASTUS_export"
+    with os.scandir(export_dir) as entries:
+        existing = {entry.name for entry in entries}
+    to_pull = [
+        hastus_file for hastus_file in hastus_files if hastus_file not in existing
+    ]
+    if not to_pull:
+        return False
+
+    def pull(hastus_file):
+        logger.info("Pulling %s...", hastus_file)
+        copy_hastus_file(args, hastus_file, export_dir / hastus_file)
 
-    if changed:
-        merge.merge_combine(tempdir / "Combine")
+    # the copies are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        list(executor.map(pull, to_pull))
 
-    return changed
+    merge.merge_combine(tempdir / "Combine")
+
+    return True
 
 
 def pull_prior_versions(tempdir):
@@ -202,7 +263,7 @@ def pull_prior_versions(tempdir):
         "Current_Release",
     )
 
-    annun_dirs = smbclient.listdir(annun_path)
+    annun_dirs = smb_listdir(annun_path)
     try:
         universal_dir = sorted(dir for dir in annun_dirs if "Universal" in dir)[0]
     except IndexError:
@@ -253,40 +314,54 @@ def write_cheat_sheet(tempdir):
         cheat_sheet.main_combine(tempdir / "Combine" / "HASTUS_export", file=file)
 
 
+def _scan(dirpath, short_path=""):
+    """
+    Yield (short_path, name, is_dir) for the entries under `dirpath` to push.
+
+    `short_path` is the directory of the entry relative to the top of the
+    scan. Parents are yielded before their children.
+    """
+    with os.scandir(dirpath) as entries:
+        entries = list(entries)
+    in_combine = dirpath.endswith("Combine")
+    for entry in entries:
+        if entry.is_dir():
+            if in_combine and entry.name.lower() != "hastus_export":
+                # don't traverse into subdirectories of Combine, except for HASTUS_export
+                continue
+            yield (short_path, entry.name, True)
+            yield from _scan(entry.path, os.path.join(short_path, entry.name))
+        elif not entry.name.startswith("."):
+            yield (short_path, entry.name, False)
+
+
 def push_directory(args, tempdir):
     """
     Push the local merged rating to the TransitMaster server.
     """
-    prefix = None
-    for dirpath, dirnames, filenames in os.walk(tempdir):
-        if prefix is None:
-            prefix = dirpath
-        short_path = dirpath[len(prefix) + 1 :]
-
-        if dirpath.endswith("Combine"):
-            # don't traverse into subdirectories of Combine, except for HASTUS_export
-            dirnames[:] = [dir for dir in dirnames if dir.lower() == "hastus_export"]
-
-        for dirname in dirnames:
-            dst = smb_path(
-                TRANSITMASTER,
-                "C$",
-                "Ratings",
-                args.rating_folder,
-                short_path,
-                dirname,
-            )
-            print(f"Making directory {dst}...")
-            smbclient.makedirs(dst, exist_ok=True)
-        for filename in filenames:
-            if filename.startswith("."):
-                continue
-            src = Path(dirpath) / filename
-            dst = smb_path(
-                TRANSITMASTER, "C$", "Ratings", args.rating_folder, short_path, filename
-            )
-            print(f"Pushing {dst}...")
-            smbclient.shutil.copy(str(src), dst)
+    dst_prefix = smb_path(TRANSITMASTER, "C$", "Ratings", args.rating_folder)
+    to_make = []
+    to_push = []
+    for short_path, name, is_dir in _scan(str(tempdir)):
+        dst = f"{dst_prefix}{SLASH}{short_path}{SLASH}{name}"
+        if is_dir:
+            to_make.append(dst)
+        else:
+            to_push.append((Path(tempdir) / short_path / name, dst))
+
+    # the scan yields parents before their children, so make the directories
+    # in order, and then copy the files into them concurrently
+    for dst in to_make:
+        logger.info("Making directory %s...", dst)
+        smbclient.makedirs(dst, exist_ok=True)
+
+    def push(src_dst):
+        (src, dst) = src_dst
+        logger.info("Pushing %s...", dst)
+        smbclient.shutil.copy(str(src), dst)
+
+    with ThreadPoolExecutor(max_workers=args.parallel) as executor:
+        list(executor.map(push, to_push))
 
 
 def sync_hastus(args):
@@ -296,17 +371,28 @@ def sync_hastus(args):
     tempdir = Path(__file__).parent.parent / "support" / "ratings" / args.rating_folder
     changed = pull_hastus_directory(args, tempdir)
     if not changed:
-        print("No changes, nothing to do!")
+        logger.info("No changes, nothing to do!")
         return 0
 
     if args.validate:
-        print("Validating...")
+        logger.info("Validating...")
         return_code = validate.validate_path(tempdir / "Combine")
         if return_code != 0:
             return return_code
-    pull_prior_versions(tempdir)
-    schedules_per_garage(tempdir)
-    write_cheat_sheet(tempdir)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        # the prior versions come from the TransitMaster server, so pull them
+        # while the local work happens
+        prior_versions = executor.submit(pull_prior_versions, tempdir)
+        try:
+            schedules_per_garage(tempdir)
+            write_cheat_sheet(tempdir)
+        except Exception:
+            # the local error is the one to raise: only log an error pulling
+            pull_error = prior_versions.exception()
+            if pull_error is not None:
+                logger.error("Error pulling prior versions: %r", pull_error)
+            raise
+        prior_versions.result()
     if args.push:
         push_directory(args, tempdir)
     return 0
@@ -316,6 +402,14 @@ def main(args):
     """
     Entrypoint for the CLI tool.
     """
+    # one handler for the whole run: the worker threads only format their
+    # messages if INFO is enabled. only this module's logger is configured,
+    # so the SMB libraries' own INFO messages stay hidden.
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
     configure_smb(args)
     if not args.hastus_export_folder:
         if args.hastus_export is None:
@@ -361,5 +455,12 @@ argparser.add_argument(
     default=True,
     help="Do not push data to the TransitMaster server",
 )
+argparser.add_argument(
+    "--parallel",
+    metavar="N",
+    type=int,
+    default=8,
+    help="Number of files to copy at the same time (default: 8)",
+)
 if __name__ == "__main__":
     sys.exit(main(argparser.parse_args()))
@@ -2,14 +2,29 @@
 Calculation of a fastest/shortest path for a given Interval.
 """
 
-from typing import Optional, List
+from concurrent.futures import ProcessPoolExecutor
+import functools
+from itertools import chain
+import os
+from typing import Iterator, Optional, List, Tuple
 import attr
+import numpy as np
 import osmnx as ox
-from .routing import RestrictedGraph
+import shapely
+from .routing import (
+    RestrictedGraph,
+    is_logging,
+    shortest_path_between,
+    turn_restricted,
+)
 from .interval import Stop, Interval, IntervalType
 
 Path = List[int]
 
+# set in each worker process by `_init_worker`
+_WORKER_GRAPH = None
+_WORKER_RESTRICTED = None
+
 
 @attr.define(kw_only=True)
 class IntervalCalculation:
@@ -56,9 +71,10 @@ class IntervalCalculation:
         """
         fastest_path = shortest_path = None
         if should_calculate(interval):
-            ox.utils.log(
-                f"calculating interval from {interval.from_stop} to {interval.to_stop}"
-            )
+            if is_logging():
+                ox.utils.log(
+                    f"calculating interval from {interval.from_stop} to {interval.to_stop}"
+                )
             fastest_path = graph.shortest_path(
                 interval.from_stop.point, interval.to_stop.point
             )
@@ -67,6 +83,95 @@ class IntervalCalculation:
                     interval.from_stop.point, interval.to_stop.point, weight="length"
                 )
 
+        return cls.from_paths(interval, fastest_path, shortest_path)
+
+    @classmethod
+    def calculate_all(
+        cls,
+        intervals: List[Interval],
+        graph: RestrictedGraph,
+        max_workers: Optional[int] = None,
+    ) -> Iterator["IntervalCalculation"]:
+        """
+        Calculate the fastest/shortest paths for each Interval, in order.
+
+        The path searches are independent, so they run in a pool of worker
+        processes, each with its own copy of the graph. Snapping the stops
+        onto the graph adds nodes to it, so that happens here first.
+
+        Many intervals (on different routes/patterns) share the same stops, so
+        each stop is only snapped once, and each pair of endpoints is only
+        searched once.
+        """
+        stop_pairs = [
+            (interval.from_stop, interval.to_stop)
+            for interval in intervals
+            if should_calculate(interval)
+        ]
+        unique_stops = list(dict.fromkeys(chain.from_iterable(stop_pairs)))
+        # build all the Points to snap in one vectorized call
+        coordinates = np.array([stop.coordinates for stop in unique_stops], dtype=float)
+        points = shapely.points(np.reshape(coordinates, (-1, 2)))
+        stop_nodes = {
+            stop: graph.closest_node(point)
+            for (stop, point) in zip(unique_stops, points)
+        }
+        endpoints = [
+            (stop_nodes[from_stop], stop_nodes[to_stop])
+            for (from_stop, to_stop) in stop_pairs
+        ]
+
+        unique_endpoints = list(dict.fromkeys(endpoints))
+        # each worker gets its own copy of the graph, so don't start more of
+        # them than there are searches to run
+        if max_workers is None:
+            max_workers = os.process_cpu_count() or 1
+        max_workers = min(max_workers, len(unique_endpoints))
+
+        if max_workers < 2:
+            unique_paths = (
+                _paths_between(graph.graph, graph.restricted, orig, dest)
+                for (orig, dest) in unique_endpoints
+            )
+            yield from cls._from_endpoint_paths(
+                intervals, _fan_out(endpoints, unique_paths)
+            )
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(
+                graph.graph,
+                graph.restricted_nodes,
+                graph.restrictions_by_node,
+            ),
+        ) as executor:
+            unique_paths = executor.map(_calculate_paths, unique_endpoints)
+            yield from cls._from_endpoint_paths(
+                intervals, _fan_out(endpoints, unique_paths)
+            )
+
+    @classmethod
+    def _from_endpoint_paths(
+        cls, intervals: List[Interval], paths: Iterator[Tuple[Optional[Path], ...]]
+    ) -> Iterator["IntervalCalculation"]:
+        for interval in intervals:
+            if should_calculate(interval):
+                yield cls.from_paths(interval, *next(paths, (None, None)))
+            else:
+                yield cls(interval=interval)
+
+    @classmethod
+    def from_paths(
+        cls,
+        interval: Interval,
+        fastest_path: Optional[Path],
+        shortest_path: Optional[Path],
+    ) -> "IntervalCalculation":
+        """
+        Build a calculation, dropping the shortest path if it's the same as the fastest.
+        """
         if fastest_path == shortest_path:
             shortest_path = None
 
@@ -85,6 +190,56 @@ class IntervalCalculation:
         ]
 
 
+def _fan_out(endpoints, unique_paths):
+    """
+    Yield the paths for each pair of endpoints, given the paths for each unique pair.
+
+    `unique_paths` is in the order that each pair first appears in `endpoints`.
+    """
+    known = {}
+    for pair in endpoints:
+        if pair not in known:
+            known[pair] = next(unique_paths, (None, None))
+        yield known[pair]
+
+
+def _init_worker(graph, restricted_nodes, restrictions_by_node) -> None:
+    """
+    Keep the graph and turn restrictions for `_calculate_paths` in this process.
+    """
+    # pylint: disable=global-statement
+    global _WORKER_GRAPH, _WORKER_RESTRICTED
+    _WORKER_GRAPH = graph
+    _WORKER_RESTRICTED = functools.partial(
+        turn_restricted, restricted_nodes, restrictions_by_node
+    )
+
+
+def _calculate_paths(
+    endpoints: Tuple[int, int],
+) -> Tuple[Optional[Path], Optional[Path]]:
+    """
+    Return the fastest and shortest paths between two nodes of the worker graph.
+    """
+    (orig, dest) = endpoints
+    return _paths_between(_WORKER_GRAPH, _WORKER_RESTRICTED, orig, dest)
+
+
+def _paths_between(
+    graph, restricted, orig: int, dest: int
+) -> Tuple[Optional[Path], Optional[Path]]:
+    """
+    Return the fastest and shortest paths between two nodes of `graph`.
+    """
+    fastest_path = shortest_path_between(graph, restricted, orig, dest)
+    if fastest_path is None:
+        return (None, None)
+    shortest_path = shortest_path_between(
+        graph, restricted, orig, dest, weight="length"
+    )
+    return (fastest_path, shortest_path)
+
+
 def should_calculate(interval: Interval) -> bool:
     """
     Return True if we should calculate a path for the given Interval.
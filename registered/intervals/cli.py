@@ -2,13 +2,18 @@
 Shared code for the `missing_intervals` and `stop_intervals` scripts.
 """
 
-from typing import Callable, Optional
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
 import osmnx as ox
+import pandas as pd
 from .page import Page
-from .routing import RestrictedGraph, configure_osmnx
-from .interval import Interval
+from .routing import RestrictedGraph, configure_osmnx, is_logging
+from .interval import Interval, SORT_KEY
 from .calculation import IntervalCalculation
 
+# CSV or database rows: either a list of dicts, or a DataFrame
+Rows = Union[list[dict[str, Any]], pd.DataFrame]
+
 
 def enable_logging() -> None:
     """
@@ -26,18 +31,38 @@ def log(line: str) -> None:
     ox.utils.log(line)
 
 
+def read_csv(path: Path) -> pd.DataFrame:
+    """
+    Read an input CSV of intervals.
+
+    The rows are read straight into a DataFrame of strings (empty cells are
+    "", as with `csv.DictReader`) rather than through a list of dicts.
+
+    The file is read as UTF-8, the same as `--output-csv` writes it. An empty
+    file has no rows, rather than raising an error.
+    """
+    try:
+        return pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8")
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(dtype=str)
+
+
 def page_from_rows(
-    rows: list[str], interval_filter: Optional[Callable[[Interval], bool]] = None
+    rows: Rows,
+    interval_filter: Optional[Callable[[Interval], bool]] = None,
 ) -> Optional[Page]:
     """
-    Process the given list of rows into a Page.
+    Process the given rows (a list of dicts, or a DataFrame) into a Page.
     """
-    intervals = sorted(Interval.from_row(row) for row in rows)
-
+    intervals: Iterable[Interval] = Interval.from_dataframe(
+        pd.DataFrame(rows, dtype=object)
+    )
+    # filter before sorting, so the sort (and its result) only has the
+    # intervals we're keeping
     if interval_filter:
-        intervals = [interval for interval in intervals if interval_filter(interval)]
+        intervals = filter(interval_filter, intervals)
 
-    return page_from_intervals(intervals)
+    return page_from_intervals(sorted(intervals, key=SORT_KEY))
 
 
 def page_from_intervals(intervals: list[Interval]) -> Optional[Page]:
@@ -46,26 +71,21 @@ def page_from_intervals(intervals: list[Interval]) -> Optional[Page]:
 
     If there are no intervals, return None.
     """
-    if not any(True for interval in intervals if interval.is_located()):
+    located = [interval for interval in intervals if interval.located]
+    if not located:
         ox.utils.log("No intervals with locations to process.")
         return None
 
     row_count = len(intervals)
 
-    (from_stops, to_stops) = zip(
-        *(
-            (interval.from_stop.point, interval.to_stop.point)
-            for interval in intervals
-            if interval.is_located()
-        )
-    )
-    graph = RestrictedGraph.from_points(from_stops + to_stops)
+    graph = RestrictedGraph.from_intervals(located)
 
     page = Page(graph=graph)
 
-    for index, interval in enumerate(intervals, 1):
-        ox.utils.log(f"processing row {index} of {row_count}: {interval!r}")
-        calc = IntervalCalculation.calculate(interval=interval, graph=graph)
+    calculations = IntervalCalculation.calculate_all(intervals, graph)
+    for index, calc in enumerate(calculations, 1):
+        if is_logging():
+            ox.utils.log(f"processed row {index} of {row_count}: {calc.interval!r}")
         page.add(calc)
 
     return page
@@ -3,20 +3,41 @@ Generic representation of an interval in TransitMaster.
 """
 
 from enum import IntEnum
-from functools import total_ordering
-from typing import Any, Optional, Union
+from functools import cached_property, total_ordering
+from operator import attrgetter
+from typing import Any, Iterable, Optional, Union
 import attr
+import numpy as np
+import pandas as pd
 from shapely.geometry import Point
 
 
-@attr.define
+def to_coordinates(value: Union[Point, tuple[Any, Any]]) -> tuple[float, float]:
+    """
+    Convert a Point or an (x, y) pair into a tuple of floats.
+    """
+    if isinstance(value, Point):
+        return (value.x, value.y)
+
+    (x, y) = value
+    return (float(x), float(y))
+
+
+# values which represent a missing coordinate in a CSV or database row
+MISSING_VALUES = (None, "")
+
+
+@attr.define(frozen=True)
 class Stop:
     """
     A location at one end of an interval (either start or end).
+
+    The location is kept as plain floats: the shapely Point is only built
+    when it's needed for routing.
     """
 
     # pylint: disable=invalid-name,missing-function-docstring
-    point: Point = attr.ib(converter=Point)
+    coordinates: tuple[float, float] = attr.ib(converter=to_coordinates)
     id: str
     description: Optional[str] = attr.ib(default=None)
 
@@ -25,21 +46,25 @@ class Stop:
 
     def __repr__(self):
         return (
-            f"Stop(Point({self.point.x!r}, {self.point.y!r}), "
+            f"Stop(Point({self.x!r}, {self.y!r}), "
             f"id={self.id!r}, description={self.description!r})"
         )
 
+    @cached_property
+    def point(self) -> Point:
+        return Point(self.coordinates)
+
     @property
     def wkt(self):
         return self.point.wkt
 
     @property
     def x(self):
-        return self.point.x
+        return self.coordinates[0]
 
     @property
     def y(self):
-        return self.point.y
+        return self.coordinates[1]
 
     @staticmethod
     def from_row(
@@ -48,13 +73,44 @@ class Stop:
         """
         Try to parse a Stop, and return either a Stop or a StopWithoutLocation.
         """
+        if lat_str in MISSING_VALUES or lon_str in MISSING_VALUES:
+            # the usual way a location is missing: check for it up front
+            # rather than raising and catching a ValueError
+            return StopWithoutLocation(id=id_, description=description)
         try:
             return Stop((lat_str, lon_str), id=id_, description=description)
         except ValueError:
-            return StopWithoutLocation(id=id, description=description)
+            return StopWithoutLocation(id=id_, description=description)
+
+    @staticmethod
+    def from_columns(
+        lon_column: pd.Series,
+        lat_column: pd.Series,
+        ids: Iterable[str],
+        descriptions: Iterable[str],
+    ) -> list[Union["Stop", "StopWithoutLocation"]]:
+        """
+        Parse columns of stops, returning either a Stop or a StopWithoutLocation for each.
 
+        The coordinates are converted a column at a time: any that can't be
+        parsed become a StopWithoutLocation.
+        """
+        xs = pd.to_numeric(lon_column, errors="coerce").to_numpy(dtype=float)
+        ys = pd.to_numeric(lat_column, errors="coerce").to_numpy(dtype=float)
+        located = ~(np.isnan(xs) | np.isnan(ys))
+        return [
+            (
+                Stop((x, y), id=id_, description=description)
+                if is_located
+                else StopWithoutLocation(id=id_, description=description)
+            )
+            for (x, y, is_located, id_, description) in zip(
+                xs.tolist(), ys.tolist(), located.tolist(), ids, descriptions
+            )
+        ]
 
-@attr.define
+
+@attr.define(frozen=True)
 class StopWithoutLocation:
     """
     Represents a stop for which we don't have a location.
@@ -100,7 +156,7 @@ def optional_int(value: Optional[Union[int, str]]) -> Optional[int]:
 
 
 @total_ordering
-@attr.define(kw_only=True)
+@attr.define(kw_only=True, frozen=True)
 class Interval:
     """
     A link between two points.
@@ -118,23 +174,28 @@ class Interval:
     pattern: Optional[str] = attr.ib(default=None)
     distance_between_map: Optional[int] = attr.ib(default=None)
     distance_between_measured: Optional[int] = attr.ib(default=None)
+    located: bool = attr.ib(init=False, eq=False, repr=False)
+
+    def __attrs_post_init__(self):
+        # the stops can't change, so only check them once
+        object.__setattr__(
+            self,
+            "located",
+            isinstance(self.from_stop, Stop) and isinstance(self.to_stop, Stop),
+        )
 
     def is_located(self):
         """
         True if both from_stop and to_stop have a location.
         """
-        return isinstance(self.from_stop, Stop) and isinstance(self.to_stop, Stop)
+        return self.located
 
     def __lt__(self, other):
         """
         Returns True if this interval has a lower pattern/direction compared to `other`.
         """
         if isinstance(other, Interval):
-            return (self.pattern, self.direction, self.id) < (
-                other.pattern,
-                other.direction,
-                other.id,
-            )
+            return SORT_KEY(self) < SORT_KEY(other)
 
         return NotImplemented
 
@@ -164,7 +225,45 @@ class Interval:
             row["ToStopNumber"],
             row["ToStopDescription"],
         )
+        return cls._from_row_with_stops(row, from_stop, to_stop)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> list["Interval"]:
+        """
+        Convert a DataFrame of CSV or database rows to Intervals.
+
+        Build the DataFrame with `dtype=object` so that the values are left as
+        they were in the rows.
+        """
+        if df.empty:
+            return []
+
+        from_stops = Stop.from_columns(
+            df["FromStopLongitude"],
+            df["FromStopLatitude"],
+            df["FromStopNumber"],
+            df["FromStopDescription"],
+        )
+        to_stops = Stop.from_columns(
+            df["ToStopLongitude"],
+            df["ToStopLatitude"],
+            df["ToStopNumber"],
+            df["ToStopDescription"],
+        )
+        return [
+            cls._from_row_with_stops(row, from_stop, to_stop)
+            for (row, from_stop, to_stop) in zip(
+                df.to_dict("records"), from_stops, to_stops
+            )
+        ]
 
+    @classmethod
+    def _from_row_with_stops(
+        cls,
+        row: dict[str, Any],
+        from_stop: Union[Stop, StopWithoutLocation],
+        to_stop: Union[Stop, StopWithoutLocation],
+    ) -> "Interval":
         description = row.get("IntervalDescription")
         if description is not None:
             (route, direction, pattern) = description.split("-", 2)
@@ -173,14 +272,20 @@ class Interval:
             direction = row.get("Direction")
             pattern = row.get("Pattern")
 
+        # id and type are converted by their attrs converters
         return cls(
-            id=optional_int(row.get("IntervalId")),
+            id=row.get("IntervalId"),
             from_stop=from_stop,
             to_stop=to_stop,
             route=route,
             direction=direction,
             pattern=pattern,
-            type=IntervalType.optional(row.get("IntervalType")),
+            type=row.get("IntervalType"),
             distance_between_map=optional_int(row.get("DistanceBetweenMap")),
             distance_between_measured=optional_int(row.get("DistanceBetweenMeasured")),
         )
+
+
+# Key for sorting Intervals by pattern/direction: `sorted(intervals,
+# key=SORT_KEY)` builds each key once, rather than once per comparison.
+SORT_KEY = attrgetter("pattern", "direction", "id")
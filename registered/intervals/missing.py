@@ -4,30 +4,58 @@ Calculate shortest/fastest paths for missing intervals.
 
 import argparse
 import csv
+import functools
 from pathlib import Path
 import re
 from registered.intervals import query
 from .interval import Interval
-from .cli import page_from_rows, enable_logging, log
+from .cli import Rows, page_from_rows, read_csv, enable_logging, log
 
 
 IGNORE_RE = re.compile(r"\d|Inbound|Outbound")
-IGNORED_PAIRS = {
-    ("4191", "4277"),  # N Main St opp Short St to N Main St opp Memorial Pkwy
-    (
-        "73619",
-        "89617",
-    ),  # 205 Washington St @ East Walpole Loop to 238 Washington St opp May St
-    (
-        "109898",
-        "109821",
-    ),  # Shirley St @ Washington Ave to Veterans Rd @ Washington Ave
-    ("censq", "16653"),  # Lynn New Busway to Market St @ Commuter Rail
-    ("14748", "censq"),  # Lynn Commuter Rail Busway to Lynn New Busway
-    ("fell", "5333"),  # Fellsway Garage to Salem St @ Fellsway Garage
-    ("ncamb", "12295"),  # North Cambridge trackless to North Cambridge Carhouse
-    ("12295", "ncamb"),  # North Cambridge Carhouse to North Cambridge trackless
-}
+IGNORED_PAIRS = frozenset(
+    {
+        ("4191", "4277"),  # N Main St opp Short St to N Main St opp Memorial Pkwy
+        (
+            "73619",
+            "89617",
+        ),  # 205 Washington St @ East Walpole Loop to 238 Washington St opp May St
+        (
+            "109898",
+            "109821",
+        ),  # Shirley St @ Washington Ave to Veterans Rd @ Washington Ave
+        ("censq", "16653"),  # Lynn New Busway to Market St @ Commuter Rail
+        ("14748", "censq"),  # Lynn Commuter Rail Busway to Lynn New Busway
+        ("fell", "5333"),  # Fellsway Garage to Salem St @ Fellsway Garage
+        ("ncamb", "12295"),  # North Cambridge trackless to North Cambridge Carhouse
+        ("12295", "ncamb"),  # North Cambridge Carhouse to North Cambridge trackless
+    }
+)
+
+
+def _group_pairs(pairs):
+    """
+    Return a dictionary of from ID => frozenset of to IDs, for the given pairs.
+    """
+    grouped = {}
+    for from_id, to_id in pairs:
+        grouped.setdefault(from_id, set()).add(to_id)
+    return {from_id: frozenset(to_ids) for (from_id, to_ids) in grouped.items()}
+
+
+# IGNORED_PAIRS, grouped by the from stop ID: checking a pair doesn't need to
+# allocate a tuple
+IGNORED_TO_STOPS = _group_pairs(IGNORED_PAIRS)
+
+
+@functools.lru_cache(maxsize=4096)
+def normalized_description(description: str) -> str:
+    """
+    Return the stop description without digits or Inbound/Outbound.
+
+    The same stops appear in many intervals, so the result is cached.
+    """
+    return IGNORE_RE.sub("", description)
 
 
 def should_ignore_interval(interval: Interval) -> bool:
@@ -41,9 +69,21 @@ def should_ignore_interval(interval: Interval) -> bool:
     """
     from_stop = interval.from_stop
     to_stop = interval.to_stop
-    return (from_stop.id, to_stop.id) in IGNORED_PAIRS or IGNORE_RE.sub(
-        "", from_stop.description
-    ) == IGNORE_RE.sub("", to_stop.description)
+    if to_stop.id in IGNORED_TO_STOPS.get(from_stop.id, ()):
+        return True
+    if from_stop.description == to_stop.description:
+        # the same description is the same after normalizing, too
+        return True
+    return normalized_description(from_stop.description) == normalized_description(
+        to_stop.description
+    )
+
+
+def is_not_ignored(interval: Interval) -> bool:
+    """
+    Only keep non-ignored intervals.
+    """
+    return not should_ignore_interval(interval)
 
 
 WHERE = """
@@ -55,29 +95,38 @@ AND
     """
 
 
-def read_database():
+# filters IGNORED_PAIRS out in the database; COALESCE keeps a stop without an
+# abbreviation from making the whole predicate NULL (and dropping the row)
+_IGNORED_PAIR = (
+    "(COALESCE(gn1.geo_node_abbr, '') = ? AND COALESCE(gn2.geo_node_abbr, '') = ?)"
+)
+IGNORED_PAIRS_WHERE = f"NOT ({' OR '.join([_IGNORED_PAIR] * len(IGNORED_PAIRS))})"
+IGNORED_PAIRS_PARAMETERS = [
+    stop_id for pair in sorted(IGNORED_PAIRS) for stop_id in pair
+]
+
+
+def read_database(include_ignored: bool = True):
     """
     Read the missing intervals from the TransitMaster DB.
+
+    If include_ignored is False, the IGNORED_PAIRS are left out by the query.
     """
-    return query.read_database(WHERE)
+    if include_ignored:
+        return query.read_database(WHERE)
+
+    return query.read_database(
+        f"{WHERE} AND {IGNORED_PAIRS_WHERE}", IGNORED_PAIRS_PARAMETERS
+    )
 
 
-def parse_rows(rows: list[str], include_ignored: bool = False):
+def parse_rows(rows: Rows, include_ignored: bool = False):
     """
     Parse the list of rows into a Page.
 
     If include_ignored is True, don't filter out ignored intervals.
     """
-    if include_ignored:
-        interval_filter = None
-    else:
-
-        def interval_filter(interval: Interval) -> bool:
-            """
-            Only keep non-ignored intervals.
-            """
-            return not should_ignore_interval(interval)
-
+    interval_filter = None if include_ignored else is_not_ignored
     return page_from_rows(rows, interval_filter=interval_filter)
 
 
@@ -88,17 +137,19 @@ def main(argv):
     enable_logging()
     if argv.input_csv:
         log(f"Reading from {argv.input_csv}...")
-        rows = list(csv.DictReader(argv.input_csv.open()))
+        rows = read_csv(argv.input_csv)
     else:
         log("Reading from TransitMaster database...")
-        rows = read_database()
+        # keep the ignored pairs if we're writing the database results out
+        rows = read_database(
+            include_ignored=argv.include_ignored or bool(argv.output_csv)
+        )
         if argv.output_csv:
-            with argv.output_csv.open("w") as out_io:
-                headers = rows[0].keys()
+            with argv.output_csv.open("w", encoding="utf-8") as out_io:
                 log(f"Writing {len(rows)} to {argv.output_csv}...")
-                writer = csv.DictWriter(out_io, headers)
-                writer.writeheader()
-                writer.writerows(rows)
+                writer = csv.writer(out_io)
+                writer.writerow(rows.columns)
+                writer.writerows(rows.itertuples(index=False, name=None))
 
     page = parse_rows(rows, include_ignored=argv.include_ignored)
     if page:
@@ -2,12 +2,19 @@
 Render shortest/fastest paths for intervals as HTML.
 """
 
+import functools
+from operator import attrgetter
 from typing import Any, List, Optional, Tuple
 import attr
 import osmnx as ox
 from jinja2 import Template
 from .routing import RestrictedGraph
-from .calculation import IntervalCalculation
+from .calculation import IntervalCalculation, Path
+
+# an international foot is exactly 0.3048 meters
+METERS_PER_FOOT = 0.3048
+# read both stops of an Interval in one C-level call
+STOPS = attrgetter("from_stop", "to_stop")
 
 
 @attr.define
@@ -25,6 +32,19 @@ class Page:
         """
         self.calculations.append(calculation)  # pylint: disable=no-member
 
+    # pylint: disable=line-too-long
+    _scripts = (
+        "https://cdn.jsdelivr.net/npm/leaflet@1.6.0/dist/leaflet.js",
+        "https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.js",
+    )
+    _stylesheets = (
+        "https://cdn.jsdelivr.net/npm/leaflet@1.6.0/dist/leaflet.css",
+        "https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.css",
+        "https://maxcdn.bootstrapcdn.com/font-awesome/4.6.3/css/font-awesome.min.css",
+        "https://maxcdn.bootstrapcdn.com/bootstrap/3.0.0/css/bootstrap-glyphicons.css",
+    )
+    # pylint: enable=line-too-long
+
     _template = Template(
         """
     <!DOCTYPE html>
@@ -147,19 +167,17 @@ class Page:
         Render the calculation as HTML.
         """
         print(calculation)
-        results = self._calculate_results(calculation)
+        paths = calculation.paths()
+        results = self._calculate_results(calculation, paths)
 
         has_maps = calculation.is_located()
         if has_maps:
-            google_maps_url = self._google_maps_url(
-                calculation.from_stop, calculation.to_stop
-            )
-            osm_url = self._osm_url(calculation.from_stop, calculation.to_stop)
-            folium_map = self._graph.folium_map(
-                calculation.from_stop.point,
-                calculation.to_stop.point,
-                calculation.paths(),
-            )
+            (from_stop, to_stop) = STOPS(calculation.interval)
+            google_maps_url = self._google_maps_url(from_stop, to_stop)
+            osm_url = self._osm_url(from_stop, to_stop)
+            # the map only needs the coordinates, so pass the stops rather
+            # than building a Point for each
+            folium_map = self._graph.folium_map(from_stop, to_stop, paths)
             folium_map.render()
             map_root = folium_map.get_root()
             folium_map_html = map_root.html.render()
@@ -178,8 +196,8 @@ class Page:
         )
 
     def _calculate_results(
-        self, calculation: IntervalCalculation
-    ) -> List[Tuple[str, str, str]]:
+        self, calculation: IntervalCalculation, paths: List[Path]
+    ) -> List[Tuple[str, str]]:
         results = []
         if calculation.interval.distance_between_measured:
             results.append(
@@ -195,40 +213,44 @@ class Page:
                     str(calculation.interval.distance_between_map),
                 )
             )
-        named_paths = list(
-            zip(["Fastest (red)", "Shortest (yellow)"], calculation.paths())
-        )
-        for name, path in named_paths:
+        if not paths:
+            results.append(("Empty", "0"))
+        for name, path in zip(("Fastest (red)", "Shortest (yellow)"), paths):
             results.append(
                 (
                     name,
                     str(self.meters_to_feet(self._graph.path_length(path))),
                 )
             )
-        if not named_paths:
-            results.append(("Empty", "0"))
         return results
 
     @staticmethod
     def _google_maps_url(from_stop, to_stop):
+        (from_x, from_y) = from_stop.coordinates
+        (to_x, to_y) = to_stop.coordinates
         return (
             f"https://www.google.com/maps/dir/?api=1&"
             f"travelmode=driving&"
-            f"origin={ from_stop.y },{ from_stop.x }&"
-            f"destination={ to_stop.y },{ to_stop.x }"
+            f"origin={ from_y },{ from_x }&"
+            f"destination={ to_y },{ to_x }"
         )
 
     @staticmethod
     def _osm_url(from_stop, to_stop) -> str:
+        (from_x, from_y) = from_stop.coordinates
+        (to_x, to_y) = to_stop.coordinates
         return (
             f"https://www.openstreetmap.org/directions?engine=fossgis_osrm_car&"
-            f"route={from_stop.y},{from_stop.x};{to_stop.y},{to_stop.x}"
+            f"route={from_y},{from_x};{to_y},{to_x}"
         )
 
     @classmethod
+    @functools.lru_cache(maxsize=2048)
     def render_stop(cls, stop) -> str:
         """
         Render a stop to HTML.
+
+        The same stops appear in many intervals, so the result is cached.
         """
         if hasattr(stop, "x") and hasattr(stop, "y"):
             osm_url = (
@@ -245,26 +267,15 @@ class Page:
         """
         Convert the given distance in meters to feet.
         """
-        return int(meters * 3.281)
+        return int(meters / METERS_PER_FOOT)
 
     def render(self) -> str:
         """
         Render to HTML.
         """
-        # pylint: disable=line-too-long
         ox.utils.log("rendering page...")
-        scripts = [
-            "https://cdn.jsdelivr.net/npm/leaflet@1.6.0/dist/leaflet.js",
-            "https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.js",
-        ]
-        stylesheets = [
-            "https://cdn.jsdelivr.net/npm/leaflet@1.6.0/dist/leaflet.css",
-            "https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.css",
-            "https://maxcdn.bootstrapcdn.com/font-awesome/4.6.3/css/font-awesome.min.css",
-            "https://maxcdn.bootstrapcdn.com/bootstrap/3.0.0/css/bootstrap-glyphicons.css",
-        ]
         return self._template.render(
-            this=self, scripts=scripts, stylesheets=stylesheets
+            this=self, scripts=self._scripts, stylesheets=self._stylesheets
         )
 
 
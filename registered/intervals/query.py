@@ -2,17 +2,21 @@
 Generate a SQL query for returning intervals.
 """
 
-from typing import Optional, Sequence, Any, Union, Tuple, Dict
+import functools
+from typing import Optional, Sequence, Any, Union, Tuple
+import pandas as pd
 from registered import db
 
 Parameters = Sequence[Any]
+FETCH_SIZE = 1000
 
 
-def read_database(
-    where: str, parameters: Optional[Parameters] = None
-) -> Dict[str, Any]:
+def read_database(where: str, parameters: Optional[Parameters] = None) -> pd.DataFrame:
     """
     Read intervals from the TransitMaster DB, given a WHERE query and optionally parameters.
+
+    Returns a DataFrame with one column per header, with the values as they
+    came from the database.
     """
     conn = db.conn()
     cursor = conn.cursor()
@@ -22,22 +26,20 @@ def read_database(
         cursor.execute(*sql(where, parameters))
 
     sql_headers = [desc[0] for desc in cursor.description]
-    result = cursor.fetchall()
-    return [dict(zip(sql_headers, row)) for row in result]
-
-
-SQL = """
-SET NOCOUNT ON;
+    cursor.arraysize = FETCH_SIZE
+    rows = []
+    while batch := cursor.fetchmany():
+        rows.extend(map(tuple, batch))
+    return pd.DataFrame(rows, columns=sql_headers, dtype=object)
 
-DECLARE @ttvid numeric(9);
-SELECT
-  @ttvid = MAX(time_table_version_id)
-FROM time_table_version;
 
+# one half of the UNION: intervals from patterns, or from deadheads. `{{where}}`
+# is left for `sql` to fill in.
+_SELECT = """
 SELECT
   @ttvid + 0.2 AS RouteVersionId,
   gni.interval_id AS IntervalId,
-  0 AS IntervalType,
+  {interval_type} AS IntervalType,
   gn1.geo_node_abbr AS FromStopNumber,
   gn1.geo_node_name AS FromStopDescription,
   (CASE
@@ -64,25 +66,25 @@ SELECT
   gni.distance_between_map AS DistanceBetweenMap,
   gni.distance_between_measured AS DistanceBetweenMeasured,
   CAST(gni.use_map AS int) AS UseMap
-FROM pattern_geo_interval_xref pgix
+FROM {source} {alias}
 INNER JOIN pattern p
-  ON pgix.pattern_id = p.pattern_id
+  ON {alias}.pattern_id = p.pattern_id
 INNER JOIN route r
   ON p.route_id = r.route_id
 INNER JOIN route_direction rd
   ON p.route_direction_id = rd.route_direction_id
 INNER JOIN geo_node_interval gni
-  ON pgix.geo_node_interval_id = gni.interval_id
+  ON {alias}.geo_node_interval_id = gni.interval_id
 INNER JOIN geo_node gn1
   ON gni.start_point_id = gn1.geo_node_id
 INNER JOIN geo_node gn2
   ON gni.end_point_id = gn2.geo_node_id
-WHERE pgix.time_table_version_id = @ttvid
-AND ({where})
+WHERE {alias}.time_table_version_id = @ttvid
+AND ({{where}})
 GROUP BY gni.interval_id,
          gni.distance_between_map,
          gni.distance_between_measured,
-         gni.use_map,
+         gni.use_map,{extra_group_by}
          gn1.geo_node_abbr,
          gn1.geo_node_name,
          gn1.use_survey,
@@ -96,77 +98,42 @@ GROUP BY gni.interval_id,
          gn2.latitude,
          gn2.map_latitude,
          gn2.longitude,
-         gn2.map_longitude
-UNION
+         gn2.map_longitude"""
+
+SQL = (
+    """
+SET NOCOUNT ON;
+
+DECLARE @ttvid numeric(9);
 SELECT
-  @ttvid + 0.2 AS RouteVersionId,
-  gni.interval_id AS IntervalId,
-  dh.dh_type AS IntervalType,
-  gn1.geo_node_abbr AS FromStopNumber,
-  gn1.geo_node_name AS FromStopDescription,
-  (CASE
-        WHEN gn1.use_survey = 1 THEN gn1.latitude
-        ELSE gn1.map_latitude END) / 10000000
-  as FromStopLatitude,
-  (CASE
-        WHEN gn1.use_survey = 1 THEN gn1.longitude
-        ELSE gn1.map_longitude END) / 10000000
-  as FromStopLongitude,
-  gn2.geo_node_abbr AS ToStopNumber,
-  gn2.geo_node_name AS ToStopDescription,
-  (CASE
-        WHEN gn2.use_survey = 1 THEN gn2.latitude
-        ELSE gn2.map_latitude END) / 10000000
-  as ToStopLatitude,
-  (CASE
-        WHEN gn2.use_survey = 1 THEN gn2.longitude
-        ELSE gn2.map_longitude END) / 10000000
-  as ToStopLongitude,
-  MIN(RTRIM(r.route_abbr)) AS Route,
-  MIN(RTRIM(rd.route_direction_name)) AS Direction,
-  MIN(RTRIM(p.pattern_abbr)) AS Pattern,
-  gni.distance_between_map AS DistanceBetweenMap,
-  gni.distance_between_measured AS DistanceBetweenMeasured,
-  CAST(gni.use_map AS int) AS UseMap
-FROM deadheads dh
-INNER JOIN pattern p
-  ON dh.pattern_id = p.pattern_id
-INNER JOIN route r
-  ON p.route_id = r.route_id
-INNER JOIN route_direction rd
-  ON p.route_direction_id = rd.route_direction_id
-INNER JOIN geo_node_interval gni
-  ON dh.geo_node_interval_id = gni.interval_id
-INNER JOIN geo_node gn1
-  ON gni.start_point_id = gn1.geo_node_id
-INNER JOIN geo_node gn2
-  ON gni.end_point_id = gn2.geo_node_id
-WHERE dh.time_table_version_id = @ttvid
-AND ({where})
-GROUP BY gni.interval_id,
-         gni.distance_between_map,
-         gni.distance_between_measured,
-         gni.use_map,
-         dh.dh_type,
-         gn1.geo_node_abbr,
-         gn1.geo_node_name,
-         gn1.use_survey,
-         gn1.latitude,
-         gn1.map_latitude,
-         gn1.longitude,
-         gn1.map_longitude,
-         gn2.geo_node_abbr,
-         gn2.geo_node_name,
-         gn2.use_survey,
-         gn2.latitude,
-         gn2.map_latitude,
-         gn2.longitude,
-         gn2.map_longitude
+  @ttvid = MAX(time_table_version_id)
+FROM time_table_version;
+"""
+    + _SELECT.format(
+        interval_type="0",
+        source="pattern_geo_interval_xref",
+        alias="pgix",
+        extra_group_by="",
+    )
+    + "\nUNION"
+    + _SELECT.format(
+        interval_type="dh.dh_type",
+        source="deadheads",
+        alias="dh",
+        extra_group_by="\n         dh.dh_type,",
+    )
+    + """
 ORDER BY IntervalType,
 Route,
 Direction,
 Pattern;
 """
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _format_sql(where: str) -> str:
+    return SQL.format(where=where)
 
 
 def sql(
@@ -178,7 +145,7 @@ def sql(
     If provided, parameters are returned duplicated, to account for the face that the WHERE clause
     is also duplicated.
     """
-    formatted = SQL.format(where=where)
+    formatted = _format_sql(where)
     if parameters is None:
         return formatted
 
@@ -8,21 +8,32 @@ import os
 import sys
 import attr
 import folium
+import numpy as np
 import osmnx as ox
 import pandas as pd
 import rtree
 import shapely
 from shapely.geometry import MultiPoint, box
 import networkx as nx
+import xyzservices
 from .routing_helpers import (
     clean_width,
     ensure_set,
+    group_restrictions_by_node,
     restrictions_in_polygon,
     angle_offset,
     cut,
 )
 
 DEFAULT_COLORS = ["red", "yellow", "blue", "green"]
+# a TileProvider rather than a URL: folium looks a URL string up in the
+# xyzservices catalog for every map
+MAP_TILES = xyzservices.TileProvider(
+    name="mbta_osm_tiles",
+    url="https://cdn.mbta.com/osm_tiles/{z}/{x}/{y}.png",
+    attribution="(C) OpenStreetMap contributors",
+    html_attribution="&copy; <a href='http://osm.org/copyright'>OpenStreetMap</a> contributors",
+)
 USEFUL_NODE_TAGS = []
 USEFUL_WAY_TAGS = [
     "oneway",
@@ -49,12 +60,77 @@ def configure_osmnx(**kwargs):
         setattr(ox.settings, k, v)
 
 
+def is_logging() -> bool:
+    """
+    Return True if OSMnx will output log messages.
+
+    Check this before building an expensive message (one with a repr or WKT)
+    in a loop, since `ox.utils.log` only takes a formatted string.
+    """
+    return bool(ox.settings.log_console or ox.settings.log_file)
+
+
 class EmptyGraph(Exception):
     """
     Raised if the graph does not have any data.
     """
 
 
+def turn_restricted(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    restricted_nodes, restrictions_by_node, origin, turn, dest, from_attrs, to_attrs
+):
+    """
+    Return a boolean indicating if the given turn is restricted.
+
+    A turn is restricted if there is a `via` relation of `type`
+    `restriction` and a `restriction` starting with `no_` (like
+    `no_left_turn` or `no_uturn`)
+
+    It is also restricted if the first and last nodes are the same (a
+    U-turn).
+
+    `restrictions_by_node` is the restrictions grouped by their via node, as
+    returned by `group_restrictions_by_node`.
+    """
+    if origin == dest:
+        # avoid u-turns
+        return True
+    from_bearing = from_attrs.get("bearing")
+    to_bearing = to_attrs.get("bearing")
+    offset = angle_offset(from_bearing, to_bearing)
+    if abs(offset) > 135:
+        # avoid making U-ish turns
+        return True
+
+    if turn not in restricted_nodes:
+        return False
+    from_ways = ensure_set(from_attrs["osmid"])
+    to_ways = ensure_set(to_attrs["osmid"])
+
+    for invalid_from, invalid_to in restrictions_by_node.get(turn, ()):
+        if (invalid_from & from_ways) and (invalid_to & to_ways):
+            return True
+    return False
+
+
+def shortest_path_between(graph, restricted, orig, dest, weight="travel_time"):
+    """
+    Return the shortest path between two existing nodes in `graph`, or None.
+
+    `restricted` is called for each turn, as in `turn_restricted`. This only
+    reads the graph, so it's safe to run against a copy of the graph in
+    another process.
+    """
+    try:
+        (_length, path) = nx.shortest_path_with_turn_restrictions(
+            graph, orig, dest, restricted, weight=weight
+        )
+    except nx.NetworkXNoPath:
+        return None
+
+    return path
+
+
 class NodesCache:
     """
     Cache of the nodes Frame.
@@ -76,10 +152,21 @@ class NodesCache:
 class EdgesCache:
     """
     Cache of the edges GeoDataFrame, with some helpful methods for querying/updating.
+
+    Only the columns in `COLUMNS` are kept: the rest of the edge attributes
+    are read from the graph itself.
+
+    New edges are appended as separate frames, which are only concatenated
+    when the whole GeoDataFrame is next needed. Geometries are also kept in
+    a dictionary by edge, so looking one up doesn't need the GeoDataFrame.
     """
 
+    COLUMNS = ["geometry", "highway", "name", "bearing"]
+
     def __init__(self, gdf):
-        self.gdf = gdf
+        gdf = gdf.reindex(columns=self.COLUMNS)
+        self._gdfs = [gdf]
+        self._geometries = dict(zip(gdf.index, gdf["geometry"]))
         self.counter = count()
         capacity = int(len(gdf) * 1.1)
         props = rtree.index.Property(
@@ -88,13 +175,26 @@ class EdgesCache:
             variant=rtree.index.RT_Star,
             fill_factor=0.9,
         )
-        self.index = rtree.index.Index(
-            (
-                (next(self.counter), t.geometry.bounds, t.Index)
-                for t in gdf.itertuples()
-            ),
-            properties=props,
-        )
+        self.index = rtree.index.Index(self._index_stream(gdf), properties=props)
+
+    @property
+    def gdf(self):
+        """
+        The GeoDataFrame of all the edges.
+        """
+        if len(self._gdfs) > 1:
+            self._gdfs = [pd.concat(self._gdfs)]
+        return self._gdfs[0]
+
+    def _index_stream(self, gdf):
+        """
+        Yield (id, bounds, edge) for each edge, to load into the rtree index.
+
+        The bounds for all the edges are calculated in one vectorized call.
+        """
+        bounds = shapely.bounds(gdf["geometry"].to_numpy())
+        for edge_bounds, edge in zip(bounds.tolist(), gdf.index):
+            yield (next(self.counter), edge_bounds, edge)
 
     def nearest_edges(self, point):
         """
@@ -105,7 +205,10 @@ class EdgesCache:
         """
         # get a few nearest edges to test, then get the actual closest one
         nearest = self.gdf.loc[self.index.nearest(point.bounds, 4, objects="raw")]
-        distances = nearest["geometry"].map(point.distance, na_action="ignore")
+        distances = pd.Series(
+            shapely.distance(nearest["geometry"].to_numpy(), point),
+            index=nearest.index,
+        )
         # bias against starting on a motorway
         distances.loc[nearest.highway.str.startswith("motorway")] *= 3
         if hasattr(point, "description"):
@@ -132,17 +235,17 @@ class EdgesCache:
 
         # otherwise, find which of the multiple edges has the point on the
         # right-hand side.
-        def calc_angle(row):
-            # might need to be updated if we stare simplifying the graph. in
-            # that case, we'd need to find the bearing at the projection of
-            # point on the given geometry. -ps
-            (tail_x, tail_y) = row["geometry"].coords[0]
-            angle_bearing = ox.bearing.calculate_bearing(
-                tail_y, tail_x, point.y, point.x
-            )
-            return angle_offset(row["bearing"], angle_bearing)
-
-        offset = within_distance.apply(calc_angle, axis=1)
+        # might need to be updated if we stare simplifying the graph. in
+        # that case, we'd need to find the bearing at the projection of
+        # point on the given geometry. -ps
+        tails = shapely.get_point(within_distance["geometry"].to_numpy(), 0)
+        angle_bearing = ox.bearing.calculate_bearing(
+            shapely.get_y(tails), shapely.get_x(tails), point.y, point.x
+        )
+        offset = pd.Series(
+            angle_offset(within_distance["bearing"].to_numpy(float), angle_bearing),
+            index=within_distance.index,
+        )
         # offsets >0 are on the right-hand side
         idx = offset.idxmax()
         return within_distance.loc[[idx]]
@@ -155,18 +258,31 @@ class EdgesCache:
             edge = from_node
         else:
             edge = (from_node, to_node, 0)
-        return self.gdf.loc[edge, "geometry"]
+        return self._geometries[edge]
+
+    def path_geometries(self, path):
+        """
+        Return an array of the geometries for each edge along the given path.
+        """
+        return np.array(
+            [
+                self._geometries[(from_node, to_node, 0)]
+                for (from_node, to_node) in zip(path, path[1:])
+            ],
+            dtype=object,
+        )
 
     def update(self, graph):
         """
         Update the cache with the new edges from the given graph.
         """
         gdf = ox.convert.graph_to_gdfs(graph, nodes=False)
-        gdf = gdf.loc[~gdf.index.isin(self.gdf.index)]
-        self.gdf = pd.concat([self.gdf, gdf])
-        self.gdf.sort_index(inplace=True)
-        for edge in gdf.itertuples():
-            self.index.insert(next(self.counter), edge.geometry.bounds, edge.Index)
+        is_new = [edge not in self._geometries for edge in gdf.index]
+        gdf = gdf.loc[is_new].reindex(columns=self.COLUMNS)
+        self._gdfs.append(gdf)
+        self._geometries.update(zip(gdf.index, gdf["geometry"]))
+        for item in self._index_stream(gdf):
+            self.index.insert(*item)
 
 
 @attr.s(repr=False)
@@ -178,8 +294,12 @@ class RestrictedGraph:
     - `restricted_nodes`: a Set of node IDs which have a turn restriction
     - `restrictions`: a List of (v, {from_osmids}, {to_osmids}) triples which
       represent invalid turns
+
+    `restrictions_by_node` has the same restrictions, grouped by `v`.
     """
 
+    # pylint: disable=too-many-instance-attributes
+
     graph = attr.ib()
     restricted_nodes = attr.ib(factory=set)
     restrictions = attr.ib(factory=list)
@@ -190,24 +310,26 @@ class RestrictedGraph:
         self._nodes_cache = NodesCache(nodes)
         self._edges_cache = EdgesCache(edges)
         self._created_nodes = {}
+        self._path_cache = {}
+        self.restrictions_by_node = group_restrictions_by_node(self.restrictions)
 
     def shortest_path(self, from_point, to_point, weight="travel_time"):
         """
         Calculate the shortest path from/to given lat/lon pairs.
 
         The shortest path is either by travel time (default) or by length (weight="length").
+
+        Paths are cached by their endpoints until the graph is next updated.
         """
         orig = self.closest_node(from_point)
         dest = self.closest_node(to_point)
 
-        try:
-            (_length, path) = nx.shortest_path_with_turn_restrictions(
-                self.graph, orig, dest, self.restricted, weight=weight
+        key = (orig, dest, weight)
+        if key not in self._path_cache:
+            self._path_cache[key] = shortest_path_between(
+                self.graph, self.restricted, orig, dest, weight=weight
             )
-        except nx.NetworkXNoPath:
-            return None
-
-        return path
+        return self._path_cache[key]
 
     def closest_node(self, point):
         """
@@ -216,22 +338,27 @@ class RestrictedGraph:
         If there isn't an existing node that's close, find the nearest edges
         and split them at the given point, returning the new node ID.
         """
-        if point.wkb in self._created_nodes:
-            return self._created_nodes[point.wkb]
-
-        ox.utils.log(f"finding closest edge to {point.wkt}")
+        # keyed by the exact coordinates: cheaper to build than the WKB
+        key = (point.x, point.y)
+        if key in self._created_nodes:
+            return self._created_nodes[key]
+
+        log_enabled = is_logging()
+        if log_enabled:
+            ox.utils.log(f"finding closest edge to {point.wkt}")
         nearest_edges = self._edges_cache.nearest_edges(point)
         snapped_point = shapely.ops.nearest_points(
             nearest_edges.iloc[0].geometry, point
         )[0]
 
-        ox.utils.log(f"snapping {point.wkt} to {snapped_point.wkt}")
         name = self._nodes_cache.new_id()
-        ox.utils.log(f"creating new node {name}")
+        if log_enabled:
+            ox.utils.log(f"snapping {point.wkt} to {snapped_point.wkt}")
+            ox.utils.log(f"creating new node {name}")
         for nearest_edge in nearest_edges.index:
             self.split_edge_at_point(nearest_edge, name, snapped_point)
 
-        self._created_nodes[point.wkb] = name
+        self._created_nodes[key] = name
         return name
 
     def split_edge_at_point(self, edge, name, point):
@@ -241,10 +368,11 @@ class RestrictedGraph:
         # 1. create a new node at point
         # 2. delete the old edge
         # 3. create two new edges, from head to node, and node to tail
-        ox.utils.log(f"splitting {edge} at {point.wkt}")
         (head, tail) = edge[:2]
         edge_attrs = self.graph.edges[edge].copy()
-        ox.utils.log(f"edge OSM ID(s): {edge_attrs['osmid']}")
+        if is_logging():
+            ox.utils.log(f"splitting {edge} at {point.wkt}")
+            ox.utils.log(f"edge OSM ID(s): {edge_attrs['osmid']}")
         length = edge_attrs.pop("length")
         del edge_attrs["travel_time"]
         # simple edges don't have a geometry in the graph, only in the cache
@@ -285,35 +413,42 @@ class RestrictedGraph:
 
         self.graph.update(subgraph)
         self._edges_cache.update(subgraph)
+        # splitting an edge can invalidate any of the cached paths
+        self._path_cache.clear()
 
         return name
 
     def path_length(self, path):
         """
         Returns the length (in meters) of the given path.
+
+        Like `ox.routing.route_to_gdf`, this uses the shortest of any parallel
+        edges, but sums the lengths directly rather than building a GeoDataFrame.
         """
-        gdf = ox.routing.route_to_gdf(self.graph, path, weight="length")
-        return gdf["length"].sum()
+        return np.fromiter(
+            (
+                min(data["length"] for data in self.graph[from_node][to_node].values())
+                for (from_node, to_node) in zip(path, path[1:])
+            ),
+            dtype=float,
+        ).sum()
 
     def folium_map(self, from_point, to_point, paths, **kwargs):
         """
         Create a `folium.Map` with the given from/to points, and optionally some paths.
 
+        The points only need `x` and `y` attributes: a `Stop` works as well as a `Point`.
+
         Returns the map.
         """
-        route_map = folium.Map(
-            tiles="https://cdn.mbta.com/osm_tiles/{z}/{x}/{y}.png",
-            attr="&copy; <a href='http://osm.org/copyright'>OpenStreetMap</a> contributors",
-            zoom_start=1,
-            **kwargs,
-        )
+        route_map = folium.Map(tiles=MAP_TILES, zoom_start=1, **kwargs)
 
         for path, color in zip(paths, DEFAULT_COLORS):
-            locations = [
-                (row[1], row[0])
-                for (from_node, to_node) in zip(path, path[1:])
-                for row in self._edges_cache.geometry(from_node, to_node).coords
-            ]
+            coordinates = shapely.get_coordinates(
+                self._edges_cache.path_geometries(path)
+            )
+            # folium wants (lat, lon) pairs
+            locations = coordinates[:, ::-1].tolist()
             folium.PolyLine(locations, weight=2, color=color).add_to(route_map)
 
         folium.Marker(
@@ -323,7 +458,9 @@ class RestrictedGraph:
             (to_point.y, to_point.x), icon=folium.Icon(icon="stop", color="red")
         ).add_to(route_map)
 
-        [east, north, west, south] = MultiPoint([from_point, to_point]).bounds
+        [east, north, west, south] = MultiPoint(
+            [(from_point.x, from_point.y), (to_point.x, to_point.y)]
+        ).bounds
         route_map.fit_bounds([(north, east), (south, west)])
 
         return route_map
@@ -336,16 +473,42 @@ class RestrictedGraph:
         "parking": {"custom_filter": '["highway"]["service"~"parking|parking_aisle"]'},
     }
 
+    @classmethod
+    def from_intervals(cls, intervals):
+        """
+        Create a RestrictedGraph covering the stops of a list of located Intervals.
+
+        The stop coordinates are read in a single pass into a preallocated
+        (2N, 2) array, without building a Point for each stop. The same stops
+        appear in many intervals, and buffering each point is the expensive
+        part of finding the bounds, so duplicates are dropped first.
+        """
+        coordinates = np.fromiter(
+            (
+                coordinate
+                for interval in intervals
+                for coordinate in (
+                    interval.from_stop.coordinates,
+                    interval.to_stop.coordinates,
+                )
+            ),
+            dtype=np.dtype((float, 2)),
+            count=2 * len(intervals),
+        )
+        return cls.from_points(np.unique(coordinates, axis=0))
+
     @classmethod
     def from_points(cls, points):
         """
         Create a RestrictedGraph covering a list of (lat, lon) points.
 
+        The points can be Points or (x, y) coordinates, such as an (N, 2) array.
+
         The polygon covering all the points is generated by finding the
         bounding box for the points, then querying the OSM API for that box.
         """
         # pylint: disable=protected-access
-        if not points:
+        if len(points) == 0:
             raise EmptyGraph("unable to build graph with no points")
         [xmin, ymin, xmax, ymax] = MultiPoint(list(points)).buffer(0.02).bounds
         polygon = box(xmin, ymin, xmax, ymax)
@@ -422,13 +585,12 @@ class RestrictedGraph:
         """
         Add "width_m" and "maxheight_m" to each edge with a width value, normalizing it to meters.
         """
-        widths = nx.get_edge_attributes(graph, "width")
-        widths_m = {k: clean_width(v) for (k, v) in widths.items()}
-        nx.set_edge_attributes(graph, values=widths_m, name="width_m")
-
-        maxheights = nx.get_edge_attributes(graph, "maxheight")
-        maxheights_m = {k: clean_width(v) for (k, v) in maxheights.items()}
-        nx.set_edge_attributes(graph, values=maxheights_m, name="maxheight_m")
+        # one pass over the edge data for both attributes, updating it in place
+        for _from_node, _to_node, data in graph.edges(data=True):
+            if "width" in data:
+                data["width_m"] = clean_width(data["width"])
+            if "maxheight" in data:
+                data["maxheight_m"] = clean_width(data["maxheight"])
 
         return graph
 
@@ -437,32 +599,31 @@ class RestrictedGraph:
         """
         Penalize some edges to reduce their use in routing.
         """
-        edges = ox.convert.graph_to_gdfs(graph, nodes=False, fill_edge_geometry=False)
-        key = ["travel_time", "length"]
-
-        # penalize residential streets
-        residential = edges["highway"].eq("residential")
-        edges.loc[residential, key] *= 1.5
-
-        # penalize narrow streets
-        if "width_m" in edges.columns:
-            narrow = edges["width_m"] < 5
-            edges.loc[narrow, key] *= 1.5
+        # a single pass over the edge data, updating it in place: building a
+        # GeoDataFrame of every edge and copying two columns back is slower
+        keys = ("travel_time", "length")
+        bus_height = 3.7  # ~12ft
+        for _from_node, _to_node, data in graph.edges(data=True):
+            # heavily penalize edges with a height limit, or which don't allow
+            # heavy vehicles
+            maxheight = data.get("maxheight_m")
+            too_low = maxheight is not None and maxheight < bus_height
+            if too_low or data.get("hgv") == "no":
+                for key in keys:
+                    data[key] = sys.float_info.max
+                continue
 
-        # heavily penalize edges with a height limit
-        if "maxheight_m" in edges.columns:
-            bus_height = 3.7  # ~12ft
-            edges.loc[edges["maxheight_m"] < bus_height, ["travel_time", "length"]] = (
-                sys.float_info.max
-            )
+            # penalize residential streets
+            if data.get("highway") == "residential":
+                for key in keys:
+                    data[key] *= 1.5
 
-        # penalize edges which don't allow heavy vehicles
-        if "hgv" in edges.columns:
-            hgv_no = edges["hgv"].eq("no")
-            edges.loc[hgv_no, key] = sys.float_info.max
+            # penalize narrow streets
+            width = data.get("width_m")
+            if width is not None and width < 5:
+                for key in keys:
+                    data[key] *= 1.5
 
-        nx.set_edge_attributes(graph, values=edges["travel_time"], name="travel_time")
-        nx.set_edge_attributes(graph, values=edges["length"], name="length")
         return graph
 
     # pylint: disable=too-many-arguments,too-many-positional-arguments
@@ -470,31 +631,14 @@ class RestrictedGraph:
         """
         Return a boolean indicating if the given turn is restricted.
 
-        A turn is restricted if there is a `via` relation of `type`
-        `restriction` and a `restriction` starting with `no_` (like
-        `no_left_turn` or `no_uturn`)
-
-        It is also restricted if the first and last nodes are the same (a
-        U-turn).
+        See `turn_restricted`.
         """
-        if origin == dest:
-            # avoid u-turns
-            return True
-        from_bearing = from_attrs.get("bearing")
-        to_bearing = to_attrs.get("bearing")
-        offset = angle_offset(from_bearing, to_bearing)
-        if abs(offset) > 135:
-            # avoid making U-ish turns
-            return True
-
-        if turn not in self.restricted_nodes:
-            return False
-        from_ways = ensure_set(from_attrs["osmid"])
-        to_ways = ensure_set(to_attrs["osmid"])
-
-        for node, invalid_from, invalid_to in self.restrictions:
-            if node != turn:
-                continue
-            if (invalid_from & from_ways) and (invalid_to & to_ways):
-                return True
-        return False
+        return turn_restricted(
+            self.restricted_nodes,
+            self.restrictions_by_node,
+            origin,
+            turn,
+            dest,
+            from_attrs,
+            to_attrs,
+        )
@@ -2,10 +2,14 @@
 Helper functions for the routing module.
 """
 
-from shapely.geometry import Point, LineString
+import functools
+import numpy as np
+import shapely
+from shapely.geometry import LineString
 import osmnx as ox
 
 
+@functools.lru_cache(maxsize=1024)
 def clean_width(width_str):
     """
     Clean width specifiers to a consistent number of meters.
@@ -14,6 +18,9 @@ def clean_width(width_str):
     - "2.0 m" -> 2.0
     - "3;4" -> 7.0
     - "5.2 ft" -> 1.58496 (convert feet to meters)
+
+    OSM uses a small set of width values across many edges, so the result is
+    cached.
     """
     FEET_TO_METERS = 0.3048  # pylint: disable=invalid-name
 
@@ -124,44 +131,54 @@ def osm_relations_to_restrictions(response):
     return (nodes, restrictions)
 
 
+def group_restrictions_by_node(restrictions):
+    """
+    Group (via node, {from ways}, {to ways}) triples by their "via" node.
+
+    Returns a dict of via node -> list of ({from ways}, {to ways}) pairs.
+    """
+    by_node = {}
+    for node, from_ways, to_ways in restrictions:
+        by_node.setdefault(node, []).append((from_ways, to_ways))
+    return by_node
+
+
 def angle_offset(base, angle):
     """
     Given a base bearing and a second bearing, return the offset in degrees.
 
     Positive offsets are clockwise/to the right, negative offsets are
     counter-clockwise/to the left.
-    """
-    # rotate the angle towards 0 by base
-    offset = angle - base
-
-    if offset <= -180:
-        # bring it back into the (-180, 180] range
-        return 360 + offset
-
-    if offset > 180:
-        return offset - 360
 
-    return offset
+    Works element-wise on numpy arrays of bearings as well as on numbers.
+    """
+    # rotate the angle towards 0 by base, then bring it back into the
+    # (-180, 180] range
+    return 180 - (180 - (angle - base)) % 360
 
 
 def cut(line, distance):
     """
     Cuts a line in two at a distance from its starting point.
     """
-    # from https://shapely.readthedocs.io/en/stable/manual.html
-    coords = list(line.coords)
+    # from https://shapely.readthedocs.io/en/stable/manual.html, but
+    # projecting all the vertices in one call rather than one at a time
+    coords = shapely.get_coordinates(line)
     if distance <= 0:
         distance = 0.01
     elif distance >= 1:
         distance = 0.99
-    for i, coord in enumerate(coords):
-        point_distance = line.project(Point(coord), normalized=True)
-        if point_distance == distance:
+    point_distances = shapely.line_locate_point(
+        line, shapely.points(coords), normalized=True
+    )
+    (after,) = np.nonzero(point_distances >= distance)
+    if len(after):
+        i = after[0]
+        if point_distances[i] == distance:
             return [LineString(coords[: i + 1]), LineString(coords[i:])]
-        if point_distance > distance:
-            cut_point = line.interpolate(distance, normalized=True)
-            return [
-                LineString(coords[:i] + [(cut_point.x, cut_point.y)]),
-                LineString([(cut_point.x, cut_point.y)] + coords[i:]),
-            ]
+        cut_point = shapely.get_coordinates(line.interpolate(distance, normalized=True))
+        return [
+            LineString(np.concatenate([coords[:i], cut_point])),
+            LineString(np.concatenate([cut_point, coords[i:]])),
+        ]
     raise ValueError(f"unable to cut {line.wkt} at {distance}")
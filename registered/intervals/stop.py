@@ -5,12 +5,13 @@ Calculate shortest/fastest paths for missing intervals.
 import argparse
 import csv
 from pathlib import Path
-from typing import Any, List
+from typing import List
+import pandas as pd
 from registered.intervals import query
-from .cli import page_from_rows, enable_logging, log
+from .cli import page_from_rows, read_csv, enable_logging, log
 
 
-def read_database(stop_ids: List[str]) -> List[List[Any]]:
+def read_database(stop_ids: List[str]) -> pd.DataFrame:
     """
     Read the stop intervals from the TransitMaster DB.
     """
@@ -26,7 +27,7 @@ def main(argv):
     enable_logging()
     if argv.input_csv:
         log(f"Reading from {argv.input_csv}...")
-        rows = list(csv.DictReader(argv.input_csv.open()))
+        rows = read_csv(argv.input_csv)
     else:
         log("Reading from TransitMaster database...")
         stop_ids = []
@@ -36,12 +37,11 @@ def main(argv):
             stop_ids += (row[0] for row in csv.reader(argv.stop_id_csv.open()))
         rows = read_database(stop_ids)
         if argv.output_csv:
-            with argv.output_csv.open("w") as out_io:
-                headers = rows[0].keys()
+            with argv.output_csv.open("w", encoding="utf-8") as out_io:
                 log(f"Writing {len(rows)} to {argv.output_csv}...")
-                writer = csv.DictWriter(out_io, headers)
-                writer.writeheader()
-                writer.writerows(rows)
+                writer = csv.writer(out_io)
+                writer.writerow(rows.columns)
+                writer.writerows(rows.itertuples(index=False, name=None))
 
     page = page_from_rows(rows)
     if page:
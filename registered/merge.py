@@ -11,7 +11,6 @@ Merge a given HASTUS export (along with the test files) into one file per type.
 - CRW: runs
 """
 
-import argparse
 import pathlib
 from datetime import datetime
 
@@ -136,10 +135,11 @@ def main(args):
     merge_combine(path)
 
 
-parser = argparse.ArgumentParser(
-    description="Merge the HASTUS export files into single file per type"
-)
-parser.add_argument("DIR", help="The Combine directory where all the file live")
-
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Merge the HASTUS export files into single file per type"
+    )
+    parser.add_argument("DIR", help="The Combine directory where all the file live")
     main(parser.parse_args())
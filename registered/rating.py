@@ -17,6 +17,11 @@ class Rating:  # pylint: disable=too-few-public-methods
     >>> rat = Rating(<path>)
     >>> rat["ppat"]
     [<items parsed from the .ppat files>]
+
+    To only get the records of a single type, use `records`:
+
+    >>> rat.records("cal", parser.CalendarDate)
+    [<CalendarDate records parsed from the .cal files>]
     """
 
     path = attr.ib(converter=pathlib.Path)
@@ -41,3 +46,15 @@ class Rating:  # pylint: disable=too-few-public-methods
             self._cache[extension] = parsed
 
         return self._cache[extension]
+
+    def records(self, extension, record_type):
+        """
+        Return the parsed records of the given type from the files with the given extension.
+        """
+        key = (extension, record_type)
+        if key not in self._cache:
+            self._cache[key] = [
+                record for record in self[extension] if isinstance(record, record_type)
+            ]
+
+        return self._cache[key]
@@ -3,14 +3,16 @@ CLI tool to validate a given HASTUS export for import to TransitMaster.
 """
 
 import argparse
-from registered.rating import Rating
-from registered.validate.validators import ALL_VALIDATORS
 
 
 def validate_rating(rating):
     """
     Validate a given Rating, yielding errors.
     """
+    # deferred so that `--help` doesn't need to load the parser
+    # pylint: disable=import-outside-toplevel
+    from registered.validate.validators import ALL_VALIDATORS
+
     seen_errors = set()
     for validator in ALL_VALIDATORS:
         for error in validator(rating):
@@ -25,6 +27,9 @@ def validate_path(path):
 
     Returns 0 if the path is valid, 1 (and prints the errors) otherwise.
     """
+    # pylint: disable=import-outside-toplevel
+    from registered.rating import Rating
+
     exit_code = 0
     for error in validate_rating(Rating(path)):
         print(error)
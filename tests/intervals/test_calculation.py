@@ -1,8 +1,75 @@
+import multiprocessing
+import networkx as nx
+import pytest
 from shapely.geometry import Point
 from registered.intervals.routing import RestrictedGraph
-from registered.intervals.interval import Stop, Interval, IntervalType
+from registered.intervals.interval import (
+    Stop,
+    StopWithoutLocation,
+    Interval,
+    IntervalType,
+)
 from registered.intervals.calculation import IntervalCalculation
 
+SEARCHES = []
+
+
+def fake_shortest_path_with_turn_restrictions(graph, orig, dest, restricted, weight):
+    """
+    Stand-in for the turn-restricted search from the networkx fork.
+    """
+    SEARCHES.append((orig, dest, weight))
+    path = nx.shortest_path(graph, orig, dest, weight=weight)
+    for from_node, turn, to_node in zip(path, path[1:], path[2:]):
+        restricted(
+            from_node,
+            turn,
+            to_node,
+            graph.edges[from_node, turn, 0],
+            graph.edges[turn, to_node, 0],
+        )
+    return (0, path)
+
+
+def grid_graph(size=4):
+    """
+    Return a RestrictedGraph of a small grid of two-way streets.
+    """
+    graph = nx.MultiDiGraph(crs="epsg:4326")
+    for i in range(size):
+        for j in range(size):
+            graph.add_node(i * size + j, x=-71.0 + i * 0.001, y=42.3 + j * 0.001)
+    osmid = 0
+    for i in range(size):
+        for j in range(size):
+            for di, dj in [(1, 0), (0, 1)]:
+                if i + di < size and j + dj < size:
+                    osmid += 1
+                    first = i * size + j
+                    second = (i + di) * size + j + dj
+                    for u, v in [(first, second), (second, first)]:
+                        graph.add_edge(
+                            u,
+                            v,
+                            osmid=osmid,
+                            highway="residential" if di else "tertiary",
+                            length=100.0 * (1 + (i * j) % 3),
+                            oneway=False,
+                        )
+    return RestrictedGraph(graph=RestrictedGraph.add_graph_features(graph))
+
+
+@pytest.fixture
+def fake_search(monkeypatch):
+    monkeypatch.setattr(
+        nx,
+        "shortest_path_with_turn_restrictions",
+        fake_shortest_path_with_turn_restrictions,
+        raising=False,
+    )
+    SEARCHES.clear()
+    return SEARCHES
+
 
 class TestIntervalCalculation:
     def test_does_not_calculate_revenue_interval(self):
@@ -22,3 +89,93 @@ class TestIntervalCalculation:
         graph = RestrictedGraph.from_points([nubian_station.point, washington_st.point])
         calculation = IntervalCalculation.calculate(interval, graph)
         assert calculation.paths() == []
+
+
+class TestCalculateAll:
+    STOPS = [
+        Stop((-71.0 + 0.00037 * k, 42.3 + 0.00041 * k), id=str(k)) for k in range(1, 8)
+    ]
+
+    def deadhead(self, from_index, to_index):
+        return Interval(
+            type=IntervalType.DEADHEAD,
+            from_stop=self.STOPS[from_index],
+            to_stop=self.STOPS[to_index],
+        )
+
+    def test_empty(self, fake_search):
+        assert list(IntervalCalculation.calculate_all([], grid_graph())) == []
+        assert fake_search == []
+
+    def test_revenue_and_unlocated(self, fake_search):
+        unlocated = Interval(
+            type=IntervalType.DEADHEAD,
+            from_stop=self.STOPS[0],
+            to_stop=StopWithoutLocation(id="unknown"),
+        )
+        revenue = Interval(
+            type=IntervalType.REVENUE, from_stop=self.STOPS[0], to_stop=self.STOPS[5]
+        )
+        intervals = [unlocated, revenue, self.deadhead(0, 5)]
+
+        calculations = list(
+            IntervalCalculation.calculate_all(intervals, grid_graph(), max_workers=1)
+        )
+
+        assert [calculation.interval for calculation in calculations] == intervals
+        assert calculations[0].paths() == []
+        assert calculations[1].paths() == []
+        assert calculations[2].paths() != []
+
+    def test_duplicate_endpoints(self, fake_search):
+        intervals = [
+            self.deadhead(0, 5),
+            self.deadhead(1, 6),
+            self.deadhead(0, 5),
+            self.deadhead(1, 6),
+        ]
+
+        calculations = list(
+            IntervalCalculation.calculate_all(intervals, grid_graph(), max_workers=1)
+        )
+
+        # one fastest and one shortest search for each unique pair of stops
+        assert len(fake_search) == 4
+        assert calculations[0].paths() != []
+        assert calculations[0].paths() == calculations[2].paths()
+        assert calculations[1].paths() == calculations[3].paths()
+
+    def test_matches_calculate(self, fake_search):
+        intervals = [self.deadhead(0, 5), self.deadhead(6, 2), self.deadhead(3, 4)]
+        graph = grid_graph()
+
+        calculations = list(
+            IntervalCalculation.calculate_all(intervals, graph, max_workers=1)
+        )
+
+        assert calculations == [
+            IntervalCalculation.calculate(interval, graph) for interval in intervals
+        ]
+
+    @pytest.mark.skipif(
+        multiprocessing.get_start_method() != "fork",
+        reason="the workers only see the fake search if they're forked",
+    )
+    def test_pool_matches_serial(self, fake_search):
+        intervals = [
+            self.deadhead(from_index, to_index)
+            for from_index in range(3)
+            for to_index in range(4, 7)
+        ]
+        intervals = intervals + intervals[::-1]
+        graph = grid_graph()
+
+        serial = list(
+            IntervalCalculation.calculate_all(intervals, graph, max_workers=1)
+        )
+        pooled = list(
+            IntervalCalculation.calculate_all(intervals, graph, max_workers=2)
+        )
+
+        assert pooled == serial
+        assert all(calculation.paths() for calculation in pooled)
@@ -0,0 +1,33 @@
+from registered.intervals.cli import page_from_rows, read_csv
+
+
+def test_read_csv(tmp_path):
+    path = tmp_path / "intervals.csv"
+    path.write_text("from_stop_id,from_stop_description\n1,\n02,NA\n")
+
+    df = read_csv(path)
+
+    assert list(df.columns) == ["from_stop_id", "from_stop_description"]
+    assert df.to_dict("records") == [
+        {"from_stop_id": "1", "from_stop_description": ""},
+        {"from_stop_id": "02", "from_stop_description": "NA"},
+    ]
+
+
+def test_read_csv_utf8(tmp_path):
+    path = tmp_path / "intervals.csv"
+    path.write_text("from_stop_description\nAvenida Beñat\n", encoding="utf-8")
+
+    df = read_csv(path)
+
+    assert df["from_stop_description"].tolist() == ["Avenida Beñat"]
+
+
+def test_read_csv_empty(tmp_path):
+    path = tmp_path / "intervals.csv"
+    path.write_text("")
+
+    df = read_csv(path)
+
+    assert df.empty
+    assert page_from_rows(df) is None
@@ -1,6 +1,13 @@
 import random
+import pandas as pd
 from shapely.geometry import Point
-from registered.intervals.interval import Stop, Interval, IntervalType
+from registered.intervals.interval import (
+    Stop,
+    StopWithoutLocation,
+    Interval,
+    IntervalType,
+    SORT_KEY,
+)
 
 
 class TestStop:
@@ -21,6 +28,21 @@ class TestStop:
         assert actual.x == 2
         assert actual.y == 3
 
+    def test_point(self):
+        actual = Stop(("-1", "-2"), id="123")
+        assert actual.point == Point(-1, -2)
+        assert actual == Stop(Point(-1, -2), id="123")
+        assert hash(actual) == hash(Stop((-1, -2), id="123"))
+
+    def test_from_row_without_location(self):
+        expected = StopWithoutLocation(id="123", description="hi")
+        assert Stop.from_row("", "", "123", "hi") == expected
+        assert Stop.from_row(None, None, "123", "hi") == expected
+        assert Stop.from_row("-1", "invalid", "123", "hi") == expected
+        assert Stop.from_row("-1", "-2", "123", "hi") == Stop(
+            (-1, -2), id="123", description="hi"
+        )
+
 
 class TestInterval:
     def test_from_row(self):
@@ -59,6 +81,33 @@ class TestInterval:
         actual = Interval.from_row(row)
         assert expected == actual
 
+    def test_from_dataframe(self):
+        located = {
+            "IntervalId": "1",
+            "IntervalType": "2",
+            "FromStopNumber": "5774",
+            "FromStopDescription": "Revere St @ Sagamore St",
+            "FromStopLatitude": "42.418574",
+            "FromStopLongitude": "-70.99272",
+            "ToStopNumber": "15795",
+            "ToStopDescription": "Wonderland Busway",
+            "ToStopLatitude": "42.413385",
+            "ToStopLongitude": "-70.99205",
+            "IntervalDescription": "116-Outbound-116-4",
+        }
+        unlocated = dict(located, IntervalId="2", ToStopLatitude="", ToStopLongitude="")
+        rows = [located, unlocated]
+
+        actual = Interval.from_dataframe(pd.DataFrame(rows, dtype=object))
+        assert actual == [Interval.from_row(row) for row in rows]
+        assert actual[0].is_located()
+        assert actual[1].to_stop == StopWithoutLocation(
+            id="15795", description="Wonderland Busway"
+        )
+
+    def test_from_dataframe_empty(self):
+        assert Interval.from_dataframe(pd.DataFrame([], dtype=object)) == []
+
     def test_sort_by_pattern_direction(self):
         stop = Stop((0, 0), id="zero")
         one = Interval(
@@ -75,3 +124,4 @@ class TestInterval:
         expected = [one, two, three]
         actual = list(sorted(shuffled))
         assert expected == actual
+        assert expected == sorted(shuffled, key=SORT_KEY)
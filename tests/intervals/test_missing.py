@@ -1,6 +1,12 @@
+import sqlite3
 from shapely.geometry import Point
 from registered.intervals.interval import Stop, Interval
-from registered.intervals.missing import parse_rows, should_ignore_interval
+from registered.intervals.missing import (
+    IGNORED_PAIRS_PARAMETERS,
+    IGNORED_PAIRS_WHERE,
+    parse_rows,
+    should_ignore_interval,
+)
 
 
 def test_should_ignore_interval():
@@ -26,6 +32,41 @@ def test_should_ignore_interval():
     )
 
 
+def test_should_ignore_interval_pair():
+    point = Point(0, 0)
+    garage = Stop(point, id="fell", description="Fellsway Garage")
+    salem_st = Stop(point, id="5333", description="Salem St @ Fellsway Garage")
+
+    assert should_ignore_interval(Interval(from_stop=garage, to_stop=salem_st))
+    assert should_ignore_interval(Interval(from_stop=salem_st, to_stop=garage)) is False
+
+
+def test_ignored_pairs_where():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE gn1 (geo_node_abbr TEXT)")
+    conn.execute("CREATE TABLE gn2 (geo_node_abbr TEXT)")
+    conn.executemany(
+        "INSERT INTO gn1 VALUES (?)", [("4191",), ("4277",), ("censq",), (None,)]
+    )
+    conn.executemany(
+        "INSERT INTO gn2 VALUES (?)", [("4191",), ("4277",), ("16653",), (None,)]
+    )
+
+    actual = set(
+        conn.execute(
+            "SELECT gn1.geo_node_abbr, gn2.geo_node_abbr FROM gn1, gn2 "
+            f"WHERE {IGNORED_PAIRS_WHERE}",
+            IGNORED_PAIRS_PARAMETERS,
+        )
+    )
+
+    assert len(actual) == 14
+    assert ("4191", "4277") not in actual
+    assert ("censq", "16653") not in actual
+    assert ("4277", "4191") in actual
+    assert (None, "4277") in actual
+
+
 def test_empty():
     rows = []
     assert parse_rows(rows) is None
@@ -0,0 +1,15 @@
+import pytest
+from registered.intervals.page import Page
+
+
+@pytest.mark.parametrize(
+    "meters,feet",
+    [
+        (0, 0),
+        (0.3048, 1),
+        (1609.344, 5280),
+        (1000, 3280),
+    ],
+)
+def test_meters_to_feet(meters, feet):
+    assert Page.meters_to_feet(meters) == feet
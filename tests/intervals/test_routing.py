@@ -81,6 +81,20 @@ def test_empty_graph(points):
         routing.RestrictedGraph.from_points(points)
 
 
+def test_is_logging(monkeypatch):
+    monkeypatch.setattr(ox.settings, "log_console", False)
+    monkeypatch.setattr(ox.settings, "log_file", False)
+    assert not routing.is_logging()
+
+    monkeypatch.setattr(ox.settings, "log_file", True)
+    assert routing.is_logging()
+
+
+def test_empty_graph_from_intervals():
+    with pytest.raises(routing.EmptyGraph):
+        routing.RestrictedGraph.from_intervals([])
+
+
 def test_short_path():
     point = Point(-71.171963, 42.271777)
     graph = routing.RestrictedGraph.from_points([point])
@@ -2,7 +2,7 @@ from itertools import product
 from registered.intervals.routing_helpers import *
 import pytest
 from pytest import approx
-from shapely.geometry import Point
+from shapely.geometry import LineString, Point
 import networkx as nx
 import osmnx as ox
 
@@ -55,6 +55,14 @@ def test_osm_relations_to_restrictions():
     assert restrictions == [(2, {6}, {7})]
 
 
+def test_group_restrictions_by_node():
+    restrictions = [(2, {6}, {7}), (3, {4}, {4}), (2, {8}, {9})]
+    assert group_restrictions_by_node(restrictions) == {
+        2: [({6}, {7}), ({8}, {9})],
+        3: [({4}, {4})],
+    }
+
+
 def test_osm_relations_to_restrictions_same_way_uturn():
     response = {
         "elements": [
@@ -94,3 +102,18 @@ def test_clean_width(width, actual):
     if actual is not None:
         actual = approx(actual)
     assert clean_width(width) == actual
+
+
+@pytest.mark.parametrize(
+    "distance,expected",
+    [
+        (0.5, ["LINESTRING (0 0, 1 0)", "LINESTRING (1 0, 2 0)"]),
+        (0.25, ["LINESTRING (0 0, 0.5 0)", "LINESTRING (0.5 0, 1 0, 2 0)"]),
+        (0.75, ["LINESTRING (0 0, 1 0, 1.5 0)", "LINESTRING (1.5 0, 2 0)"]),
+        (0, ["LINESTRING (0 0, 0.02 0)", "LINESTRING (0.02 0, 1 0, 2 0)"]),
+        (1, ["LINESTRING (0 0, 1 0, 1.98 0)", "LINESTRING (1.98 0, 2 0)"]),
+    ],
+)
+def test_cut(distance, expected):
+    line = LineString([(0, 0), (1, 0), (2, 0)])
+    assert [part.wkt for part in cut(line, distance)] == expected
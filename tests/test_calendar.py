@@ -0,0 +1,19 @@
+from io import StringIO
+from pathlib import Path
+from registered import calendar
+
+CAL_PATH = (
+    Path(__file__).parent
+    / "support"
+    / "validation"
+    / "invalid"
+    / "overlapping_cal_exception"
+)
+
+
+def test_main_combine():
+    out = StringIO()
+    calendar.main_combine(CAL_PATH, file=out)
+    assert out.getvalue() == (
+        "date,Albny,BenTT,Cabot,Somvl\n" "2020-04-11,,,016,a36\n" "2020-05-23,,016,,\n"
+    )
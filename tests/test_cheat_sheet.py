@@ -53,6 +53,13 @@ class TestExceptionCombination:
 
         assert expected == actual
 
+    def test_hashable(self):
+        first = ExceptionCombination("016", {"sa6": {"Cabot", "Somvl"}})
+        second = ExceptionCombination("016", {"sa6": {"Somvl", "Cabot"}})
+
+        assert hash(first) == hash(second)
+        assert len({first, second, ExceptionCombination("016")}) == 2
+
     def test_should_take_out(self):
         assert ExceptionCombination("011").should_take_out() == False
         assert ExceptionCombination("l31").should_take_out()
@@ -110,6 +117,20 @@ class TestCheatSheet:
         assert actual.sunday_base == ExceptionCombination("017")
         assert actual.date_combos == {date(2020, 12, 23): ExceptionCombination("l31")}
 
+    def test_calculate_bases_tie(self):
+        # a tie goes to the combo seen first, even on a different day type
+        first = ExceptionCombination("011")
+        second = ExceptionCombination("012")
+        sunday = ExceptionCombination("013")
+        day_type_combos = [
+            ("Saturday", first),
+            ("Weekday", second),
+            ("Weekday", first),
+            ("Sunday", sunday),
+        ]
+
+        assert CheatSheet.calculate_bases(day_type_combos) == (first, first, sunday)
+
     def test_str(self):
         sheet = CheatSheet(
             season_name="Winter",
@@ -246,14 +267,14 @@ def test_date_groups():
         date(2021, 1, 30),
     }
     expected = [
-        {
+        [
             date(2020, 12, 28),
             date(2020, 12, 29),
             date(2020, 12, 30),
             date(2020, 12, 31),
-        },
-        {date(2021, 1, 18), date(2021, 1, 19)},
-        {date(2021, 1, 30)},
+        ],
+        [date(2021, 1, 18), date(2021, 1, 19)],
+        [date(2021, 1, 30)],
     ]
     actual = date_groups(dates)
     assert actual == expected
@@ -262,12 +283,24 @@ def test_date_groups():
 def test_date_groups_single():
     dates = {date(2021, 1, 18), date(2021, 2, 15)}
     expected = [
-        {
+        [
             date(2021, 1, 18),
-        },
-        {
+        ],
+        [
             date(2021, 2, 15),
-        },
+        ],
     ]
     actual = date_groups(dates)
     assert actual == expected
+
+
+def test_date_groups_empty():
+    assert date_groups(set()) == []
+
+
+def test_date_range_str():
+    assert date_range_str([date(2021, 1, 18)]) == "Mon 1/18"
+    assert (
+        date_range_str([date(2021, 1, 18), date(2021, 1, 19), date(2021, 1, 20)])
+        == "Mon 1/18 - Wed 1/20"
+    )
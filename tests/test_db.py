@@ -3,7 +3,7 @@ from registered import db
 
 def test_grouper_list():
     original = [1, 2, 3, 4, 5, 6, 7]
-    expected = [[1, 2], [3, 4], [5, 6], [7]]
+    expected = [(1, 2), (3, 4), (5, 6), (7,)]
     actual = list(db.grouper(original, 2))
 
     assert actual == expected
@@ -11,7 +11,7 @@ def test_grouper_list():
 
 def test_grouper_list_exact_size():
     original = [1, 2, 3, 4, 5, 6]
-    expected = [[1, 2], [3, 4], [5, 6]]
+    expected = [(1, 2), (3, 4), (5, 6)]
     actual = list(db.grouper(original, 2))
 
     assert actual == expected
@@ -19,7 +19,13 @@ def test_grouper_list_exact_size():
 
 def test_grouper_iterable():
     original = range(7)
-    expected = [[0, 1, 2], [3, 4, 5], [6]]
+    expected = [(0, 1, 2), (3, 4, 5), (6,)]
     actual = list(db.grouper(original, 3))
 
     assert actual == expected
+
+
+def test_geo_node_sql():
+    sql = db.geo_node_sql(3)
+    assert sql.count("?") == 3
+    assert db.geo_node_sql(3) is sql
@@ -1,4 +1,4 @@
-from registered.friendly_environ import FriendlyEnviron
+from registered.friendly_environ import EnvFile, FriendlyEnviron
 import pytest
 
 
@@ -29,3 +29,28 @@ def test_key_missing():
         env["MISSING"]
 
     assert ".env" in str(excinfo.value)
+
+
+def test_env_file(tmp_path):
+    path = tmp_path / ".env"
+    env_file = EnvFile(path)
+    # the file isn't read until the first lookup
+    path.write_text("KEY=value\n# comment\n SPACED = spaced value \nURL=a=b\n")
+
+    assert env_file["KEY"] == "value"
+    assert env_file["SPACED"] == "spaced value"
+    assert env_file["URL"] == "a=b"
+    assert "MISSING" not in env_file
+    assert len(env_file) == 3
+
+
+def test_env_file_missing(tmp_path):
+    env = FriendlyEnviron(EnvFile(tmp_path / ".env"), {"KEY": "value"})
+    assert env["KEY"] == "value"
+    assert env.get("MISSING") is None
+
+
+def test_parent_precedence():
+    env = FriendlyEnviron({"KEY": "first"}, {"KEY": "second", "OTHER": "other"})
+    assert env["KEY"] == "first"
+    assert env["OTHER"] == "other"
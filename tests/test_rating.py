@@ -0,0 +1,21 @@
+from pathlib import Path
+from registered import parser
+from registered.rating import Rating
+
+CAL_PATH = (
+    Path(__file__).parent
+    / "support"
+    / "validation"
+    / "invalid"
+    / "overlapping_cal_exception"
+)
+
+
+def test_records_by_type():
+    rating = Rating(CAL_PATH, expect_all_files=False)
+    calendar_dates = rating.records("cal", parser.CalendarDate)
+
+    assert len(calendar_dates) == 4
+    assert all(isinstance(record, parser.CalendarDate) for record in calendar_dates)
+    assert len(rating.records("cal", parser.Calendar)) == 4
+    assert rating.records("cal", parser.CalendarDate) is calendar_dates